@@ -0,0 +1,15 @@
+"""
+Benchmarks of the bot, run as modules from the root of the repository:
+
+    $ python -m benchmarks.votes --help
+
+They are not part of the deployed apps, and the ones which need a database create
+and destroy a test database (see benchmarks.fixtures).
+"""
+
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "turbot.settings")
+django.setup()
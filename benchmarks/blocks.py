@@ -0,0 +1,76 @@
+import argparse
+import time
+import tracemalloc
+
+from slackblocks import (
+    Button,
+    Confirm,
+    ContextBlock,
+    DividerBlock,
+    SectionBlock,
+    Text,
+    serialize_blocks,
+)
+
+
+def make_message(nb_blocks: int):
+    """
+    A message shaped like a large poll: sections with a button, and a footer.
+    """
+    blocks = [
+        SectionBlock(
+            Text("*Benchmark*\n\nTotal votes: `42`"),
+            accessory=Button(
+                "Delete Poll",
+                action_id="polls.delete",
+                value="1",
+                confirm=Confirm("Delete Poll", text="Are you sure?"),
+            ),
+        ),
+        DividerBlock(),
+    ]
+    for i in range(nb_blocks - 3):
+        blocks.append(
+            SectionBlock(
+                f":keycap_ten: Choice {i}\t`3`\n<@U1> <@U2> <@U3>",
+                accessory=Button(text="Vote", action_id="polls.vote", value=f"{i}"),
+            )
+        )
+    blocks.append(ContextBlock("*Created By:* <@U1>"))
+    return blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the allocations and time of building and serializing blocks"
+    )
+    parser.add_argument("--blocks", type=int, default=50, help="Message blocks")
+    parser.add_argument("--rounds", type=int, default=1000, help="Messages built")
+    options = parser.parse_args()
+    nb_blocks, rounds = options.blocks, options.rounds
+
+    tracemalloc.start()
+    blocks = make_message(nb_blocks)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    serialize_blocks(blocks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{nb_blocks} blocks: {retained / 1024:.1f} KiB of objects, "
+        f"{(peak - retained) / 1024:.1f} KiB peak while serializing"
+    )
+
+    for name, run in (
+        ("build", lambda: make_message(nb_blocks)),
+        ("build and serialize", lambda: serialize_blocks(make_message(nb_blocks))),
+    ):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            run()
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {elapsed / rounds * 1000:.3f}ms per message")
+
+
+if __name__ == "__main__":
+    main()
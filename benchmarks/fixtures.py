@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from polls.models import Poll
+from workspaces.models import Team, Channel, User
+
+
+@contextmanager
+def test_database():
+    """
+    Run a benchmark on a test database, created before and destroyed after it, so
+    that the configured database is never written.
+    """
+    setup_test_environment()
+    name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+        teardown_test_environment()
+
+
+def make_poll(nb_choices: int, nb_users: int, unique_choice: bool = False):
+    """
+    A poll without votes and `nb_users` users of its team, the first one being its
+    creator.
+    """
+    team = Team.objects.create(id="TBENCH", domain="bench")
+    channel = Channel.objects.create(id="CBENCH", name="bench", team=team)
+    users = [
+        User.objects.create(id=f"UBENCH{i}", name=f"bench{i}", team=team)
+        for i in range(nb_users)
+    ]
+    poll = Poll.objects.create(
+        name="Benchmark",
+        creator=users[0],
+        channel=channel,
+        unique_choice=unique_choice,
+    )
+    for i in range(nb_choices):
+        poll.choices.create(index=i, text=f"Choice {i} :tada:")
+    return poll, users
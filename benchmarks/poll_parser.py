@@ -0,0 +1,79 @@
+import argparse
+import random
+import re
+import time
+
+from polls.actions import InvalidPollException, parse_poll_text
+
+# The pattern parse_poll_text replaced
+LEGACY_PATTERN = re.compile(
+    "\\s*(?P<start_quote>[‘’“”'\"])(((?!(?P=start_quote)).)+)(?P=start_quote)\\s*"
+)
+
+
+def legacy_parse(text):
+    return [value[1] for value in LEGACY_PATTERN.findall(text)]
+
+
+def parse(text):
+    try:
+        return parse_poll_text(text)
+    except InvalidPollException:
+        return None
+
+
+WORST_CASES = {
+    # The leading \s* of the pattern is retried from every blank
+    "blanks without a quote": lambda n: " " * n + "a",
+    # A long value whose closing quote is missing
+    "unclosed value": lambda n: '"' + "a" * n,
+    "many values": lambda n: ' "a"' * (n // 4),
+}
+
+
+def fuzz(rounds):
+    """
+    Parse random inputs, which must either parse or raise InvalidPollException.
+    """
+    rng = random.Random(0)
+    alphabet = "ab \\'\"“”‘’\n"
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 64)))
+        if parse(text) is None:
+            errors += 1
+    elapsed = time.perf_counter() - start
+    print(f"fuzz: {rounds} inputs in {elapsed:.2f}s, {errors} rejected, no crash")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the poll text parser with the previous regex on "
+        "adversarial input"
+    )
+    parser.add_argument("--max-size", type=int, default=16000, help="Input size")
+    parser.add_argument("--fuzz", type=int, default=10000, help="Random inputs")
+    options = parser.parse_args()
+
+    sizes = []
+    size = 1000
+    while size <= options.max_size:
+        sizes.append(size)
+        size *= 2
+
+    for case, make_text in WORST_CASES.items():
+        for name, run in (("legacy", legacy_parse), ("parser", parse)):
+            timings = []
+            for size in sizes:
+                text = make_text(size)
+                start = time.perf_counter()
+                run(text)
+                timings.append(f"{size}: {(time.perf_counter() - start) * 1000:.2f}ms")
+            print(f"{case} ({name}): {', '.join(timings)}")
+
+    fuzz(options.fuzz)
+
+
+if __name__ == "__main__":
+    main()
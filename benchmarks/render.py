@@ -0,0 +1,63 @@
+import argparse
+import json
+import time
+
+from benchmarks.fixtures import make_poll, test_database
+from polls.models import RENDERED_CHOICES, Poll
+from slackblocks import resolve_blocks, serialize_blocks
+
+
+def bench_serialization(blocks, rounds):
+    for name, serialize in (
+        ("repr", repr),
+        ("json.dumps", lambda b: json.dumps(resolve_blocks(b))),
+        ("serialize_blocks", serialize_blocks),
+    ):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            payload = serialize(blocks)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name}: {len(payload.encode())} bytes, "
+            f"{elapsed / rounds * 1000:.3f}ms per message"
+        )
+
+
+def bench_vote_render(poll, rounds):
+    """
+    Render the poll after each vote, with and without the choice block cache.
+    Votes are excluded from the timings, the queries of the render are not.
+    """
+    choices = list(poll.choices.order_by("index"))
+    for name, cached in (("uncached", False), ("cached", True)):
+        elapsed = 0
+        for i in range(rounds):
+            choices[i % len(choices)].toggle_vote(poll.creator_id)
+            if not cached:
+                RENDERED_CHOICES.clear()
+            start = time.perf_counter()
+            Poll.objects.select_related("creator").get(id=poll.id).render_slack_blocks()
+            elapsed += time.perf_counter() - start
+        print(f"render after a vote ({name}): {elapsed / rounds * 1000:.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the rendering and serialization of a poll message"
+    )
+    parser.add_argument("--choices", type=int, default=9, help="Poll choices")
+    parser.add_argument("--voters", type=int, default=20, help="Voters per choice")
+    parser.add_argument("--rounds", type=int, default=1000, help="Serializations")
+    options = parser.parse_args()
+
+    with test_database():
+        poll, users = make_poll(options.choices, options.voters)
+        for choice in poll.choices.all():
+            for user in users:
+                choice.toggle_vote(user.id)
+        bench_serialization(poll.get_slack_blocks(), options.rounds)
+        bench_vote_render(poll, options.rounds // 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import time
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+
+from benchmarks.fixtures import make_poll, test_database
+from polls.models import Poll, Choice, UserChoice
+
+
+def legacy_toggle_vote(choice, user, unique_choice):
+    """
+    The vote path used before Choice.toggle_vote, with the vote counters.
+    """
+    if choice.voters.filter(id=user.id).exists():
+        choice.voters.remove(user)
+        choice_delta = delta = -1
+    else:
+        choice_delta = delta = 1
+        if unique_choice:
+            votes = UserChoice.objects.filter(
+                user_id=user.id, choice__poll_id=choice.poll_id
+            )
+            Choice.objects.filter(id__in=votes.values("choice_id")).update(
+                vote_count=F("vote_count") - 1
+            )
+            delta -= votes.delete()[0]
+        choice.voters.add(user)
+    Choice.objects.filter(id=choice.id).update(
+        vote_count=F("vote_count") + choice_delta
+    )
+    Poll.objects.filter(id=choice.poll_id).update(vote_count=F("vote_count") + delta)
+
+
+def run(options):
+    poll, (user,) = make_poll(4, 1, options.unique)
+    choices = list(poll.choices.order_by("index"))
+
+    for name, toggle in (
+        ("legacy", lambda c: legacy_toggle_vote(c, user, options.unique)),
+        ("toggle_vote", lambda c: c.toggle_vote(user.id, options.unique)),
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for i in range(options.votes):
+                with transaction.atomic():
+                    toggle(choices[i % len(choices)])
+            elapsed = time.perf_counter() - start
+
+        statements = len(queries) / options.votes
+        print(
+            f"{connection.vendor} {name}: {options.votes} votes in "
+            f"{elapsed:.2f}s ({elapsed / options.votes * 1000:.2f}ms per vote, "
+            f"{statements:.1f} statements per vote)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the cost of a vote toggle with the previous vote path"
+    )
+    parser.add_argument("--votes", type=int, default=1000, help="Votes to cast")
+    parser.add_argument("--unique", action="store_true", help="Unique choice poll")
+    options = parser.parse_args()
+
+    with test_database():
+        run(options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import threading
+import time
+from contextlib import nullcontext
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.test import override_settings
+
+from benchmarks.fixtures import make_poll, test_database
+from polls import actions
+from workspaces.utils import SlackState
+
+
+class FakeSlackClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def chat_update(self, **kwargs):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return {"ok": True}
+
+
+def run(client, options):
+    poll, users = make_poll(4, options.voters, options.unique)
+    choices = list(poll.choices.order_by("index"))
+
+    def inline_vote(state):
+        with transaction.atomic():
+            actions.vote(state)
+            settings.SLACK_CLIENT.chat_update(
+                ts=state.ts, channel=state.channel_id, blocks=poll.slack_blocks
+            )
+
+    vote = inline_vote if options.inline_slack else actions.vote
+    retries = []
+
+    def voter(user):
+        try:
+            for i in range(options.votes):
+                state = SlackState(
+                    team_id=poll.channel.team_id,
+                    user_id=user.id,
+                    channel_id=poll.channel_id,
+                    type="block_actions",
+                    command="polls.vote",
+                    text=str(choices[i % len(choices)].id),
+                    payload={},
+                    ts="1.0",
+                )
+                # SQLite fails concurrent writers right away instead of waiting
+                while True:
+                    try:
+                        vote(state)
+                        break
+                    except DatabaseError as e:
+                        retries.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=voter, args=(user,)) for user in users]
+    # The inline mode already updates the message in the vote transaction
+    updates = (
+        patch.object(actions, "request_poll_update", lambda *args, **kwargs: None)
+        if options.inline_slack
+        else nullcontext()
+    )
+    with updates:
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        # Let the coalesced updates go out before destroying the database
+        for thread in threading.enumerate():
+            if isinstance(thread, threading.Timer):
+                thread.join()
+
+    total = options.voters * options.votes
+    print(
+        f"{connection.vendor}: {total} votes by {options.voters} voters in "
+        f"{elapsed:.2f}s ({total / elapsed:.1f} votes/s), "
+        f"{client.calls} chat_update calls, {len(retries)} retries"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the vote throughput of concurrent voters on a single poll"
+    )
+    parser.add_argument("--voters", type=int, default=8, help="Concurrent voters")
+    parser.add_argument("--votes", type=int, default=20, help="Votes per voter")
+    parser.add_argument(
+        "--slack-latency",
+        type=int,
+        default=200,
+        help="Simulated Slack API latency (ms)",
+    )
+    parser.add_argument("--unique", action="store_true", help="Unique choice poll")
+    parser.add_argument(
+        "--inline-slack",
+        action="store_true",
+        help="Call Slack inside the vote transaction, like votes used to",
+    )
+    options = parser.parse_args()
+
+    client = FakeSlackClient(options.slack_latency / 1000)
+    with test_database(), override_settings(SLACK_CLIENT=client):
+        run(client, options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+def worker_exit(server, worker):
+    # Let the Slack jobs already acknowledged finish before the worker goes away
+    from django.conf import settings
+    from workspaces.dispatch import dispatcher
+
+    dispatcher.shutdown(settings.SLACK_DISPATCH_DRAIN_TIMEOUT)
@@ -1,5 +1,6 @@
 import logging
 import re
+from typing import List
 
 import slack.errors
 from django.conf import settings
@@ -9,7 +10,9 @@ from slackblocks import (
     InputBlock,
     TextInput,
 )
-from polls.models import Poll, Choice, UserChoice
+from polls.models import Poll, Choice, PollMessage
+from polls.updates import request_poll_update
+from workspaces.dispatch import dispatch, run_handlers
 from workspaces.utils import (
     register_slack_action,
     register_slack_command,
@@ -20,92 +23,169 @@ from workspaces.modal import send_modal, get_modal_state, make_modal
 
 logger = logging.getLogger("slackbot")
 
-POLL_TEXT_PATTERN = re.compile(
-    "\s*(?P<start_quote>[‘’“”'\"])(((?!(?P=start_quote)).)+)(?P=start_quote)\s*"
-)
+DOUBLE_QUOTES = '"“”'
+SINGLE_QUOTES = "'‘’"
+# The quotes closing a value, by opening quote: a straight quote only closes its
+# own values (so that ’ can be used as an apostrophe), a curly quote is closed by
+# its pair or by the straight quote
+CLOSING_QUOTES = {
+    '"': '"',
+    "'": "'",
+    "“": '“”"',
+    "”": '”"',
+    "‘": "‘’'",
+    "’": "’'",
+}
+# A closing quote, with the backslash which may escape it
+QUOTE_ENDS = {
+    quote: re.compile(f"(\\\\?)([{closing}])")
+    for quote, closing in CLOSING_QUOTES.items()
+}
+BLANKS = re.compile(r"\s*")
 
 
 class InvalidPollException(BaseException):
     pass
 
 
+def parse_poll_text(text: str) -> List[str]:
+    """
+    Split the text of a poll command into its quoted values, in a single pass.
+    A backslash escapes a closing quote, unless that quote is followed by a blank
+    or the end of the text: "C:\\" is the value C:\\. Other backslashes are kept.
+    Raises InvalidPollException with the position of the first error.
+    """
+    values = []
+    position = BLANKS.match(text).end()
+    while position < len(text):
+        quote = text[position]
+        end = QUOTE_ENDS.get(quote)
+        if end is None:
+            raise InvalidPollException(
+                f"Unexpected `{quote}` at character {position + 1}, "
+                f"the name and the choices must be quoted"
+            )
+        start = position
+        position += 1
+        value = ""
+        while True:
+            match = end.search(text, position)
+            if match is None:
+                raise InvalidPollException(
+                    f"The quote {quote} at character {start + 1} is never closed"
+                )
+            escaped, closing = match.groups()
+            value += text[position : match.start()]
+            position = match.end()
+            if escaped and position < len(text) and not text[position].isspace():
+                value += closing
+                continue
+            value += escaped
+            break
+        if not value:
+            raise InvalidPollException(f"Empty value at character {start + 1}")
+        values.append(value)
+        position = BLANKS.match(text, position).end()
+    return values
+
+
 def get_poll_choices(text, is_open=False) -> (str, [str]):
-    values = [value[1] for value in POLL_TEXT_PATTERN.findall(text)]
+    values = parse_poll_text(text)
 
+    if not values:
+        raise InvalidPollException("You must provide a name")
     if len(values) < 3 and not is_open:
         raise InvalidPollException("You must provide a name and at least two choices")
 
     return values[0], values[1:]
 
 
-@transaction.atomic
 @register_slack_action("polls.vote")
+@transaction.atomic
 def vote(state):
-    choice = Choice.objects.prefetch_related("voters", "poll").get(id=state.text)
-
-    if choice.voters.filter(id=state.user.id).exists():
-        choice.voters.remove(state.user)
-    else:
-        if choice.poll.unique_choice:
-            UserChoice.objects.filter(
-                user__id=state.user.id, choice__poll=choice.poll
-            ).delete()
-        choice.voters.add(state.user)
-
-    logger.debug(
-        settings.SLACK_CLIENT.chat_update(
-            ts=state.ts,
-            text=f"Poll: {choice.poll.name}",
-            channel=state.channel.id,
-            blocks=choice.poll.slack_blocks,
-        )
+    choice = Choice.objects.select_related("poll__creator").get(id=state.text)
+
+    # Makes sure the user exists before voting
+    user = state.user
+    choice.toggle_vote(user.id, choice.poll.unique_choice)
+
+    transaction.on_commit(
+        lambda: request_poll_update(choice.poll, state.channel_id, state.ts)
     )
 
 
-@transaction.atomic
+def notify_deletion(state, channel_id):
+    logger.debug(settings.SLACK_CLIENT.chat_delete(ts=state.ts, channel=channel_id))
+    send_message(state, f"A poll was deleted by {state.user.slack_username}")
+
+
 @register_slack_action("polls.delete")
+@transaction.atomic
 def delete(state):
     poll = Poll.objects.get(id=state.text)
 
-    if not state.user.has_permissions and state.user != poll.creator:
+    if state.user_id != poll.creator_id and not state.user.has_permissions:
         send_ephemeral(state, f"You are not the creator of this poll.")
         return
 
-    logger.debug(
-        settings.SLACK_CLIENT.chat_delete(ts=state.ts, channel=poll.channel.id,)
-    )
+    transaction.on_commit(lambda: notify_deletion(state, poll.channel_id))
+    transaction.on_commit(lambda: purge_poll(state, poll.id))
 
-    send_message(state, f"A poll was deleted by {state.user.slack_username}")
-    poll.delete()
 
+def purge_poll(state, poll_id):
+    """
+    Delete the poll in the background if the dispatcher is enabled, as large polls
+    take a while to clean up.
+    """
+    handlers = [lambda _: Poll.purge([poll_id])]
+    if not dispatch(handlers, state):
+        run_handlers(handlers, state)
 
-def create_poll(state, name, choices, params):
-    poll = Poll.objects.create(
-        name=name,
-        creator=state.user,
-        channel=state.channel,
-        unique_choice="unique" in params,
-        anonymous="annon" in params,
-        visible_results="annon" not in params,
-        open_choice="open" in params,
-    )
-
-    for index, choice in enumerate(choices):
-        poll.choices.create(index=index, text=choice)
 
+def publish_poll(state, poll):
+    """
+    Post a new poll, and delete it if Slack refuses the message.
+    """
+    blocks, fingerprint = poll.render_slack_blocks()
     try:
-        send_message(state, text=f"Poll: {poll.name}", blocks=poll.slack_blocks)
+        response = send_message(state, text=f"Poll: {poll.name}", blocks=blocks)
     except slack.errors.SlackApiError as e:
         poll.delete()
         raise e
 
+    PollMessage.objects.create(
+        poll=poll,
+        channel=response["channel"],
+        ts=response["ts"],
+        fingerprint=fingerprint,
+    )
+
+
+def create_poll(state, name, choices, params):
+    with transaction.atomic():
+        poll = Poll.objects.create(
+            name=name,
+            creator=state.user,
+            channel=state.channel,
+            unique_choice="unique" in params,
+            anonymous="annon" in params,
+            visible_results="annon" not in params,
+            open_choice="open" in params,
+        )
+
+        Choice.objects.bulk_create(
+            Choice(poll=poll, index=index, text=choice)
+            for index, choice in enumerate(choices)
+        )
+
+        transaction.on_commit(lambda: publish_poll(state, poll))
+
 
 @register_slack_command("/poll", params=[])
 @register_slack_command("/poll-open", params=["open"])
 @register_slack_command("/poll-unique", params=["unique"])
 @register_slack_command("/poll-anon", params=["annon"])
 @register_slack_command("/poll-anon-unique", params=["unique", "annon"])
-@transaction.atomic
 def create(state, params=[]):
     try:
         name, choices = get_poll_choices(state.text, "open" in params)
@@ -115,24 +195,18 @@ def create(state, params=[]):
     create_poll(state, name, choices, params)
 
 
-@transaction.atomic
 @register_slack_action("polls.reveal")
 def reveal_results(state):
-    poll = Poll.objects.get(id=state.text)
+    poll = Poll.objects.select_related("creator").get(id=state.text)
 
-    if poll.creator.id != state.user.id:
+    if poll.creator_id != state.user_id:
         send_ephemeral(state, f"You are not the creator of this poll.")
         return
 
+    Poll.objects.filter(id=poll.id).update(visible_results=True)
     poll.visible_results = True
-    poll.save()
 
-    settings.SLACK_CLIENT.chat_update(
-        ts=state.ts,
-        text=f"Poll: {poll.name}",
-        channel=state.channel.id,
-        blocks=poll.slack_blocks,
-    )
+    request_poll_update(poll, state.channel_id, state.ts, delay=0)
 
 
 @register_slack_action("polls.new_choice")
@@ -153,20 +227,17 @@ def modal_new_choice(state):
     )
 
 
-@transaction.atomic
 @register_slack_action("polls.new_choice.send")
+@transaction.atomic
 def add_new_choice(state):
     if state.type == "view_submission":
         modal_state = get_modal_state(state.payload)
         choice = modal_state["polls.choice"]["value"]
 
-        poll = Poll.objects.get(id=state.text)
+        poll = Poll.objects.select_related("creator").get(id=state.text)
 
-        poll.choices.create(index=len(poll.choices.all()), text=choice)
+        poll.add_choice(choice)
 
-        settings.SLACK_CLIENT.chat_update(
-            ts=state.ts,
-            text=f"Poll: {poll.name}",
-            channel=state.channel.id,
-            blocks=poll.slack_blocks,
+        transaction.on_commit(
+            lambda: request_poll_update(poll, state.channel_id, state.ts, delay=0)
         )
@@ -5,7 +5,7 @@ from .models import Poll, Choice, UserChoice
 @admin.register(Poll)
 class PollAdmin(admin.ModelAdmin):
     list_filter = ("channel", "anonymous")
-    readonly_fields = ["created_at"]
+    readonly_fields = ["created_at", "vote_count"]
 
 
 admin.site.register(Choice)
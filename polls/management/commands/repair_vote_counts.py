@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from polls.models import Poll, Choice, UserChoice
+
+
+class Command(BaseCommand):
+    help = "Recompute the vote counters of the polls and their choices"
+
+    def add_arguments(self, parser):
+        parser.add_argument("poll_ids", nargs="*", type=int, help="Only these polls")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the wrong counters",
+        )
+
+    def handle(self, *args, poll_ids=None, dry_run=False, **options):
+        choices = Choice.objects.all()
+        polls = Poll.objects.all()
+        if poll_ids:
+            choices = choices.filter(poll_id__in=poll_ids)
+            polls = polls.filter(id__in=poll_ids)
+
+        with transaction.atomic():
+            wrong_choices = choices.annotate(actual=Count("voters")).exclude(
+                vote_count=F("actual")
+            )
+            for choice in wrong_choices:
+                self.stdout.write(
+                    f"{choice}: {choice.vote_count} votes instead of {choice.actual}"
+                )
+            if not dry_run:
+                # Recounted in the UPDATE itself, so that votes cast meanwhile are kept
+                Choice.objects.filter(id__in=[c.id for c in wrong_choices]).update(
+                    vote_count=Coalesce(
+                        Subquery(
+                            UserChoice.objects.filter(choice=OuterRef("pk"))
+                            .values("choice")
+                            .annotate(count=Count("pk"))
+                            .values("count")
+                        ),
+                        0,
+                    )
+                )
+
+            wrong_polls = polls.annotate(
+                actual=Coalesce(Sum("choices__vote_count"), 0)
+            ).exclude(vote_count=F("actual"))
+            for poll in wrong_polls:
+                self.stdout.write(
+                    f"{poll}: {poll.vote_count} votes instead of {poll.actual}"
+                )
+            if not dry_run:
+                Poll.objects.filter(id__in=[p.id for p in wrong_polls]).update(
+                    vote_count=Coalesce(
+                        Subquery(
+                            Choice.objects.filter(poll=OuterRef("pk"))
+                            .values("poll")
+                            .annotate(count=Sum("vote_count"))
+                            .values("count")
+                        ),
+                        0,
+                    )
+                )
+
+        self.stdout.write(
+            f"{len(wrong_choices)} choices and {len(wrong_polls)} polls "
+            + ("to repair" if dry_run else "repaired")
+        )
@@ -0,0 +1,55 @@
+# Generated by Django 3.0.5 on 2026-10-18 03:19
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def count_votes(apps, schema_editor):
+    Poll = apps.get_model("polls", "Poll")
+    Choice = apps.get_model("polls", "Choice")
+    UserChoice = apps.get_model("polls", "UserChoice")
+
+    Choice.objects.update(
+        vote_count=Coalesce(
+            Subquery(
+                UserChoice.objects.filter(choice=OuterRef("pk"))
+                .values("choice")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+    Poll.objects.update(
+        vote_count=Coalesce(
+            Subquery(
+                Choice.objects.filter(poll=OuterRef("pk"))
+                .values("poll")
+                .annotate(count=Sum("vote_count"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0009_auto_20200529_2049"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="choice",
+            name="vote_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="poll",
+            name="vote_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_votes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.0.5 on 2026-10-18 03:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0010_vote_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PollMessage",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("channel", models.CharField(max_length=30)),
+                ("ts", models.CharField(max_length=30)),
+                ("version", models.PositiveIntegerField(default=0)),
+                ("rendered_version", models.PositiveIntegerField(default=0)),
+                ("sending_since", models.DateTimeField(blank=True, null=True)),
+                (
+                    "poll",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="messages",
+                        to="polls.Poll",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("channel", "ts")},
+            },
+        ),
+    ]
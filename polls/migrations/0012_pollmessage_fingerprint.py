@@ -0,0 +1,18 @@
+# Generated by Django 3.0.5 on 2026-10-18 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0011_pollmessage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pollmessage",
+            name="fingerprint",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.0.5 on 2026-10-18 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0012_pollmessage_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userchoice",
+            index=models.Index(
+                fields=["choice", "created_at", "id"],
+                name="polls_userc_choice__4ba867_idx",
+            ),
+        ),
+    ]
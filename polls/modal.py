@@ -1,13 +1,21 @@
 import logging
+from datetime import datetime
 
-from polls.actions import create_poll
+from django.conf import settings
+
+from polls.actions import create_poll, vote
+from polls.models import Choice, UserChoice
 from slackblocks import (
+    SectionBlock,
     TextInput,
     InputBlock,
     Option,
     Checkboxes,
     ActionsBlock,
     Button,
+    BlockTemplate,
+    hole,
+    join_blocks,
 )
 from workspaces.modal import (
     send_modal,
@@ -25,8 +33,8 @@ from workspaces.utils import (
 logger = logging.getLogger("slackbot")
 
 
-def get_blocks(nb_choice):
-    return [
+HEADER_TEMPLATE = BlockTemplate(
+    [
         InputBlock("Title", block_id="title", element=TextInput("poll.title")),
         InputBlock(
             "Params",
@@ -41,19 +49,29 @@ def get_blocks(nb_choice):
                 ],
             ),
         ),
-        *(
-            [
-                InputBlock(
-                    "Choice",
-                    block_id=f"{i}",
-                    element=TextInput(f"poll.choice{i}"),
-                    optional=True,
-                )
-                for i in range(nb_choice)
-            ]
-        ),
-        ActionsBlock(elements=Button("Add choice", "poll.build.add_choice")),
     ]
+)
+
+CHOICE_TEMPLATE = BlockTemplate(
+    InputBlock(
+        "Choice",
+        block_id=hole("index"),
+        element=TextInput(f"poll.choice{hole('index')}"),
+        optional=True,
+    )
+)
+
+FOOTER_TEMPLATE = BlockTemplate(
+    ActionsBlock(elements=Button("Add choice", "poll.build.add_choice"))
+)
+
+
+def get_blocks(nb_choice):
+    return join_blocks(
+        HEADER_TEMPLATE.fill(),
+        *(CHOICE_TEMPLATE.fill(index=i) for i in range(nb_choice)),
+        FOOTER_TEMPLATE.fill(),
+    )
 
 
 @register_slack_command("/poll-build")
@@ -107,3 +125,72 @@ def post_poll(state):
                 name = modal_state[s]["value"]
 
         create_poll(state, name, choices, params)
+
+
+def make_voters_modal(state, choice, after=None):
+    """
+    Modal listing a page of the voters of `choice`, with a button to the next page.
+    """
+    voters, last = UserChoice.get_voters_page(
+        choice.id, after, settings.POLL_VOTERS_PAGE_SIZE
+    )
+    blocks = [
+        SectionBlock(f"*{choice.slack_text}*\t`{choice.vote_count}`"),
+        SectionBlock(" ".join(voters) if voters else "No voters"),
+    ]
+    if last:
+        created_at, vote_id = last
+        blocks.append(
+            ActionsBlock(
+                Button(
+                    "Next voters",
+                    "polls.voters.next",
+                    value=f"{choice.id}|{created_at.isoformat()}|{vote_id}",
+                )
+            )
+        )
+    return make_modal(
+        state,
+        title="Voters",
+        blocks=blocks,
+        action_id="polls.voters.page",
+        submit="Close",
+        close="Back",
+    )
+
+
+def see_voters(state):
+    choice = Choice.objects.select_related("poll").get(id=state.text)
+    if choice.poll.anonymous:
+        return
+
+    send_modal(state, make_voters_modal(state, choice), keep_view_id=True)
+
+
+@register_slack_action("polls.choice_menu")
+def choice_menu(state):
+    """
+    The menu of a choice whose voters are not all shown.
+    """
+    option, state.text = state.text.split(":", 1)
+    if option == "vote":
+        vote(state)
+    else:
+        see_voters(state)
+
+
+@register_slack_action("polls.voters.page")
+def voters_page(state):
+    if state.type == "block_actions":
+        dispatch_modal_actions(state)
+
+
+@register_slack_action("polls.voters.next")
+def next_voters(state):
+    choice_id, created_at, vote_id = state.payload["actions"][0]["value"].split("|")
+    choice = Choice.objects.select_related("poll").get(id=choice_id)
+    if choice.poll.anonymous:
+        return
+
+    after = (datetime.fromisoformat(created_at), int(vote_id))
+    update_modal(state, make_voters_modal(state, choice, after))
@@ -1,18 +1,50 @@
-from django.db import models
-from django.db.models import CheckConstraint, Q
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import (
+    Case,
+    CheckConstraint,
+    F,
+    IntegerField,
+    Max,
+    Q,
+    When,
+    Window,
+)
+from django.db.models.functions import Coalesce, RowNumber
+from django.db.models.signals import post_delete
 from django.utils import timezone
 
 from slackblocks import (
+    Block,
     Button,
     SectionBlock,
     Confirm,
     DividerBlock,
     ActionsBlock,
     ContextBlock,
+    Option,
+    Overflow,
+    fingerprint_blocks,
+    resolve_block,
+    resolve_blocks,
+    split_sections,
+    to_json,
 )
+from workspaces.identity import IdentityMap
 from workspaces.models import User, Channel
 from workspaces.utils import int_to_emoji
 
+LAST_UPDATED_BLOCK_ID = "poll.last_updated"
+
+# Resolved choice blocks of each poll, by (choice id, position, choice text)
+RENDERED_CHOICES = IdentityMap(
+    settings.POLL_RENDER_CACHE_SIZE, settings.POLL_RENDER_CACHE_TTL
+)
+
 
 class Poll(models.Model):
     name = models.CharField(max_length=256)
@@ -25,13 +57,73 @@ class Poll(models.Model):
     open_choice = models.BooleanField(default=False)
     visible_results = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    vote_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ["-created_at"]
 
+    def get_rendered_choices(self):
+        """
+        Load the choices, and the Slack usernames of their first voters (unless the
+        poll is anonymous), in two queries whatever the number of choices and voters.
+        """
+        choices = list(self.choices.order_by("index"))
+        if self.anonymous:
+            return choices
+
+        voters = UserChoice.get_first_voters(self.id, settings.POLL_VOTERS_SHOWN)
+        for choice in choices:
+            choice.voter_list = voters[choice.id]
+        return choices
+
+    def add_choice(self, text: str, attempts: int = 3) -> "Choice":
+        """
+        Add a choice after the last one.
+        The index is read and inserted in two statements, so a concurrent addition
+        may take it first: the insertion is then retried with the next index.
+        """
+        for attempt in range(attempts):
+            last = self.choices.aggregate(index=Coalesce(Max("index"), -1))
+            index = last["index"] + 1
+            try:
+                with transaction.atomic():
+                    return self.choices.create(index=index, text=text)
+            except IntegrityError:
+                if attempt == attempts - 1:
+                    raise
+
     @property
-    def slack_blocks(self):
-        total_votes = UserChoice.objects.filter(choice__poll__id=self.id).count()
+    def block_namespace(self) -> str:
+        return f"poll-{self.id}"
+
+    def get_choice_blocks(self, choices, start: int) -> List[dict]:
+        """
+        The resolved blocks of the choices, the first one being at position `start`.
+        Only the choices whose text changed since the last render are resolved
+        again, the others come from RENDERED_CHOICES.
+        """
+        cached = RENDERED_CHOICES.get(self.id) or {}
+        rendered = {}
+        position = start
+        for choice in choices:
+            text = choice.get_slack_text(self.visible_results, self.anonymous)
+            key = (choice.id, position, text)
+            blocks = cached.get(key)
+            if blocks is None:
+                blocks = [
+                    resolve_block(block, position + offset, self.block_namespace)
+                    for offset, block in enumerate(
+                        choice.get_slack_blocks(self.visible_results, self.anonymous)
+                    )
+                ]
+            rendered[key] = blocks
+            position += len(blocks)
+        RENDERED_CHOICES.set(self.id, rendered)
+        return [block for blocks in rendered.values() for block in blocks]
+
+    def get_slack_blocks(self) -> List[Block]:
+        choices = self.get_rendered_choices()
+        total_votes = sum(choice.vote_count for choice in choices)
 
         blocks = [
             SectionBlock(
@@ -46,10 +138,7 @@ class Poll(models.Model):
                 ),
             ),
             DividerBlock(),
-            *map(
-                lambda c: c.get_slack_block(self.visible_results, self.anonymous),
-                self.choices.order_by("index").prefetch_related("voters").all(),
-            ),
+            *self.get_choice_blocks(choices, start=2),
             *(
                 [
                     ActionsBlock(
@@ -77,10 +166,46 @@ class Poll(models.Model):
                 else []
             ),
             ContextBlock(f"*Created By:* {self.creator.slack_username}"),
-            ContextBlock(f'{timezone.now().strftime("Last updated: %x at %H:%M")}'),
+            ContextBlock(
+                f'{timezone.now().strftime("Last updated: %x at %H:%M")}',
+                block_id=LAST_UPDATED_BLOCK_ID,
+            ),
         ]
 
-        return repr(blocks)
+        return blocks
+
+    def render_slack_blocks(self) -> Tuple[str, str]:
+        """
+        The serialized blocks, and the fingerprint of their content, which ignores
+        the "Last updated" time.
+        """
+        blocks = split_sections(
+            resolve_blocks(self.get_slack_blocks(), self.block_namespace)
+        )
+        return to_json(blocks), fingerprint_blocks(blocks, {LAST_UPDATED_BLOCK_ID})
+
+    @property
+    def slack_blocks(self):
+        return self.render_slack_blocks()[0]
+
+    @classmethod
+    @transaction.atomic
+    def purge(cls, poll_ids: List[int]) -> int:
+        """
+        Delete the polls with their choices, votes and messages, with one DELETE
+        statement per table.
+        Unlike Poll.delete, nothing is loaded in Python, and no signal is sent.
+        Returns the number of polls deleted.
+        """
+        using = cls.objects.db
+        choices = Choice.objects.filter(poll_id__in=poll_ids)
+        UserChoice.objects.filter(choice_id__in=choices.values("id"))._raw_delete(using)
+        PollMessage.objects.filter(poll_id__in=poll_ids)._raw_delete(using)
+        choices._raw_delete(using)
+        deleted = cls.objects.filter(id__in=poll_ids)._raw_delete(using)
+        for poll_id in poll_ids:
+            RENDERED_CHOICES.invalidate(poll_id)
+        return deleted
 
     def __str__(self):
         return (
@@ -92,6 +217,7 @@ class Choice(models.Model):
     index = models.PositiveSmallIntegerField()
     text = models.CharField(max_length=256)
     poll = models.ForeignKey(Poll, related_name="choices", on_delete=models.CASCADE)
+    vote_count = models.PositiveIntegerField(default=0)
     voters = models.ManyToManyField(
         User,
         through="UserChoice",
@@ -102,27 +228,103 @@ class Choice(models.Model):
     class Meta:
         unique_together = ("index", "poll")
 
+    def toggle_vote(self, user_id: str, unique_choice: bool = False) -> bool:
+        """
+        Remove the vote of a user if it exists, add it otherwise, and update the vote
+        counters. On unique choice polls, the other votes of the user are removed.
+        Returns whether the user now votes for this choice.
+        Must be called inside a transaction.
+        """
+        if UserChoice.objects.filter(user_id=user_id, choice_id=self.id).delete()[0]:
+            self._update_vote_count(-1)
+            return False
+
+        if not UserChoice.insert_ignore(user_id, self.id):
+            # A concurrent click of the same user was committed first
+            return True
+
+        if not unique_choice:
+            self._update_vote_count(1)
+            return True
+
+        # Counts this vote and discounts the other votes of the user in one UPDATE
+        votes = UserChoice.objects.filter(user_id=user_id, choice__poll_id=self.poll_id)
+        cleared = (
+            Choice.objects.filter(id__in=votes.values("choice_id")).update(
+                vote_count=F("vote_count")
+                + Case(
+                    When(id=self.id, then=1), default=-1, output_field=IntegerField()
+                )
+            )
+            - 1
+        )
+        if cleared:
+            votes.exclude(choice_id=self.id).delete()
+        if cleared != 1:
+            Poll.objects.filter(id=self.poll_id).update(
+                vote_count=F("vote_count") + 1 - cleared
+            )
+        return True
+
+    def _update_vote_count(self, delta: int):
+        Choice.objects.filter(id=self.id).update(vote_count=F("vote_count") + delta)
+        Poll.objects.filter(id=self.poll_id).update(vote_count=F("vote_count") + delta)
+
     @property
     def slack_text(self):
         return f"{int_to_emoji(self.index)} {self.text}"
 
+    @property
+    def first_voters(self) -> List[str]:
+        if getattr(self, "voter_list", None) is None:
+            self.voter_list = UserChoice.get_first_voters(
+                self.poll_id, settings.POLL_VOTERS_SHOWN, choice_id=self.id
+            )[self.id]
+        return self.voter_list
+
+    @property
+    def hidden_voter_count(self) -> int:
+        return max(0, self.vote_count - len(self.first_voters))
+
     @property
     def slack_voters(self):
-        return " ".join(map(lambda u: u.slack_username, self.voters.all()))
+        voters = " ".join(self.first_voters)
+        if self.hidden_voter_count:
+            voters += f" and {self.hidden_voter_count} others"
+        return voters
 
-    def get_slack_block(self, show_results=True, anonymous=False):
+    def get_slack_text(self, show_results=True, anonymous=False):
         voter_count = ""
         if show_results:
-            voter_count = f"\t`{self.voters.count()}`"
+            voter_count = f"\t`{self.vote_count}`"
 
         voters = ""
         if not anonymous:
             voters = f"\n{self.slack_voters}"
 
-        return SectionBlock(
-            f"{self.slack_text}{voter_count}{voters}",
-            accessory=Button(text="Vote", action_id="polls.vote", value=f"{self.id}"),
-        )
+        return f"{self.slack_text}{voter_count}{voters}"
+
+    def get_slack_blocks(self, show_results=True, anonymous=False) -> List[Block]:
+        """
+        The section of the choice, with a Vote button, or a menu to vote or see all
+        the voters if some of them are not shown.
+        A single block per choice, as a message cannot have more than 50 blocks.
+        """
+        if not anonymous and self.hidden_voter_count:
+            accessory = Overflow(
+                action_id="polls.choice_menu",
+                options=[
+                    Option("Vote", value=f"vote:{self.id}"),
+                    Option("See voters", value=f"voters:{self.id}"),
+                ],
+            )
+        else:
+            accessory = Button(text="Vote", action_id="polls.vote", value=f"{self.id}")
+        return [
+            SectionBlock(
+                self.get_slack_text(show_results, anonymous), accessory=accessory
+            )
+        ]
 
     def __str__(self):
         return f'Choice "{self.text}" of poll "{self.poll.name}" ({self.poll.id})'
@@ -136,6 +338,120 @@ class UserChoice(models.Model):
     class Meta:
         unique_together = ("user", "choice")
         ordering = ("created_at",)
+        indexes = [models.Index(fields=["choice", "created_at", "id"])]
+
+    @classmethod
+    def get_first_voters(
+        cls, poll_id: int, limit: int, choice_id: Optional[int] = None
+    ) -> Dict[int, List[str]]:
+        """
+        The Slack usernames of the `limit` first voters of each choice of a poll (or
+        of one choice), in one query.
+        """
+        votes = cls.objects.filter(choice__poll_id=poll_id)
+        if choice_id is not None:
+            votes = votes.filter(choice_id=choice_id)
+        ranked = (
+            votes.order_by()
+            .annotate(
+                voter_rank=Window(
+                    RowNumber(),
+                    partition_by=[F("choice_id")],
+                    order_by=[F("created_at").asc(), F("id").asc()],
+                )
+            )
+            .values_list("choice_id", "user_id", "user__suffix", "voter_rank")
+        )
+        sql, params = ranked.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT * FROM ({sql}) ranked WHERE voter_rank <= %s ORDER BY 1, 4",
+                (*params, limit),
+            )
+            voters = defaultdict(list)
+            for choice_id, user_id, suffix, _ in cursor.fetchall():
+                voters[choice_id].append(User.format_slack_username(user_id, suffix))
+        return voters
+
+    @classmethod
+    def get_voters_page(
+        cls, choice_id: int, after: Optional[Tuple[datetime, int]], size: int
+    ) -> Tuple[List[str], Optional[Tuple[datetime, int]]]:
+        """
+        The Slack usernames of `size` voters of a choice, following the vote `after`
+        (keyset pagination on the creation date and id of the votes).
+        Returns the voters, and the key of the last one if there are more.
+        """
+        votes = cls.objects.filter(choice_id=choice_id)
+        if after is not None:
+            created_at, vote_id = after
+            votes = votes.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=vote_id)
+            )
+        rows = list(
+            votes.order_by("created_at", "id").values_list(
+                "created_at", "id", "user_id", "user__suffix"
+            )[: size + 1]
+        )
+        voters = [User.format_slack_username(row[2], row[3]) for row in rows[:size]]
+        if len(rows) > size:
+            return voters, rows[size - 1][:2]
+        return voters, None
+
+    @classmethod
+    def insert_ignore(cls, user_id: str, choice_id: int) -> bool:
+        """
+        Insert a vote unless it exists, in a single statement.
+        Returns whether the vote was inserted.
+        """
+        ops = connection.ops
+        fields = [
+            cls._meta.get_field(name) for name in ("user", "choice", "created_at")
+        ]
+        sql = (
+            f"{ops.insert_statement(ignore_conflicts=True)} "
+            f"{ops.quote_name(cls._meta.db_table)} "
+            f"({', '.join(ops.quote_name(field.column) for field in fields)}) "
+            f"VALUES (%s, %s, %s) {ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}"
+        )
+        params = [
+            user_id,
+            choice_id,
+            fields[2].get_db_prep_value(timezone.now(), connection),
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount == 1
 
     def __str__(self):
         return f"{self.user} : {self.choice}"
+
+
+class PollMessage(models.Model):
+    """
+    A Slack message showing a poll.
+    `version` is bumped on each change of the poll, and `rendered_version` is the
+    last version sent to Slack, by the process holding the `sending_since` lease.
+    `fingerprint` is the one of the content last sent, to skip identical updates.
+    """
+
+    poll = models.ForeignKey(Poll, related_name="messages", on_delete=models.CASCADE)
+    channel = models.CharField(max_length=30)
+    ts = models.CharField(max_length=30)
+    version = models.PositiveIntegerField(default=0)
+    rendered_version = models.PositiveIntegerField(default=0)
+    sending_since = models.DateTimeField(null=True, blank=True)
+    fingerprint = models.CharField(max_length=32, blank=True, default="")
+
+    class Meta:
+        unique_together = ("channel", "ts")
+
+    def __str__(self):
+        return f"Message {self.ts} in {self.channel} of poll {self.poll_id}"
+
+
+def _evict_rendered_choices(sender, instance, **kwargs):
+    RENDERED_CHOICES.invalidate(instance.pk)
+
+
+post_delete.connect(_evict_rendered_choices, sender=Poll)
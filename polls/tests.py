@@ -1,5 +1,30 @@
-from django.test import TestCase
-from .actions import get_poll_choices, InvalidPollException
+import json
+import random
+import re
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from slack.errors import SlackApiError
+
+from slackblocks import MAX_BLOCKS, resolve_blocks, serialize_blocks
+from workspaces.identity import clear_identity_maps
+from workspaces.models import Team, Channel, User
+from workspaces.utils import SlackState
+from .actions import (
+    CLOSING_QUOTES,
+    DOUBLE_QUOTES,
+    create_poll,
+    delete,
+    get_poll_choices,
+    parse_poll_text,
+    InvalidPollException,
+)
+from .models import RENDERED_CHOICES, Choice, Poll, PollMessage, UserChoice
+from .updates import request_poll_update, flush_poll_message
 
 
 class TestPollChoices(TestCase):
@@ -26,3 +51,344 @@ class TestPollChoices(TestCase):
         name, choices = get_poll_choices(r'"Simple Question" "1" "2" “3” ‘4’ “5"')
         self.assertEqual("Simple Question", name)
         self.assertEqual(["1", "2", "3", "4", "5"], choices)
+
+    def test_escaped_quotes(self):
+        name, choices = get_poll_choices(r""""Say \"hi\"" "C:\\" "don\'t" 'it\'s'""")
+        self.assertEqual('Say "hi"', name)
+        self.assertEqual(["C:\\\\", "don\\'t", "it's"], choices)
+
+    def test_apostrophe_in_single_quotes(self):
+        self.assertEqual(
+            ["Question", "Qu’est-ce", "B"],
+            parse_poll_text("\"Question\" 'Qu’est-ce' 'B'"),
+        )
+
+    def test_trailing_backslash(self):
+        self.assertEqual(
+            ["Path", "C:\\Users\\", "D"],
+            parse_poll_text(r'"Path" "C:\Users\" "D"'),
+        )
+
+    def test_parse_errors(self):
+        for text, error in (
+            ('"Question" choice', "Unexpected `c` at character 12"),
+            ('"Question" "choice', 'The quote " at character 12 is never closed'),
+            ('"Question" ""', "Empty value at character 12"),
+        ):
+            with self.assertRaisesMessage(InvalidPollException, error):
+                get_poll_choices(text, is_open=True)
+
+    def test_parse_random_values(self):
+        rng = random.Random(42)
+        alphabet = "ab \\'\"“”‘’"
+        for _ in range(500):
+            quote = rng.choice(DOUBLE_QUOTES)
+            closing = CLOSING_QUOTES[quote]
+            values = [
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+                for _ in range(rng.randint(1, 5))
+            ]
+            # An escaped quote followed by a blank cannot be told from a closing one
+            values = [
+                value for value in values if not re.search(f"[{closing}]\\s", value)
+            ] or ["a"]
+            text = " ".join(
+                quote + re.sub(f"([{closing}])", r"\\\1", value) + closing[-1]
+                for value in values
+            )
+            self.assertEqual(values, parse_poll_text(text))
+
+
+class TestPollRendering(TestCase):
+    def setUp(self):
+        RENDERED_CHOICES.clear()
+        team = Team.objects.create(id="T1", domain="team")
+        self.channel = Channel.objects.create(id="C1", name="general", team=team)
+        self.users = [
+            User.objects.create(id=f"U{i}", name=f"user{i}", team=team)
+            for i in range(20)
+        ]
+
+    def make_poll(self, nb_choices, nb_voters, **kwargs):
+        poll = Poll.objects.create(
+            name="Poll", creator=self.users[0], channel=self.channel, **kwargs
+        )
+        for index in range(nb_choices):
+            choice = poll.choices.create(index=index, text=f"Choice {index}")
+            for user in self.users[:nb_voters]:
+                choice.voters.add(user)
+        call_command("repair_vote_counts", poll.id, stdout=StringIO())
+        return poll.id
+
+    def assertRenderQueries(self, poll_id, num):
+        with self.assertNumQueries(num):
+            Poll.objects.select_related("creator").get(id=poll_id).slack_blocks
+
+    def test_render_queries_do_not_grow(self):
+        self.assertRenderQueries(self.make_poll(2, 1), 3)
+        self.assertRenderQueries(self.make_poll(9, 20), 3)
+
+    def test_anonymous_render_skips_voters(self):
+        self.assertRenderQueries(self.make_poll(9, 20, anonymous=True), 2)
+
+    def test_render_content(self):
+        poll_id = self.make_poll(2, 2)
+        blocks = json.loads(Poll.objects.get(id=poll_id).slack_blocks)
+
+        self.assertIn("Total votes: `4`", blocks[0]["text"]["text"])
+        self.assertEqual(":one: Choice 0\t`2`\n<@U0> <@U1>", blocks[2]["text"]["text"])
+
+    def test_render_is_compact(self):
+        blocks = Poll.objects.get(id=self.make_poll(2, 2)).get_slack_blocks()
+        rendered = serialize_blocks(blocks)
+
+        self.assertNotIn("\n", rendered)
+        self.assertNotIn('": ', rendered)
+        self.assertEqual(resolve_blocks(blocks), json.loads(rendered))
+
+    def test_render_reuses_unchanged_choices(self):
+        poll_id = self.make_poll(3, 2)
+        first = Poll.objects.get(id=poll_id).get_slack_blocks()
+        Poll.objects.get(id=poll_id).choices.get(index=1).toggle_vote("U5")
+        second = Poll.objects.get(id=poll_id).get_slack_blocks()
+
+        self.assertIs(first[2], second[2])
+        self.assertIsNot(first[3], second[3])
+        self.assertIn("<@U5>", second[3]["text"]["text"])
+        self.assertIs(first[4], second[4])
+
+        Poll.objects.get(id=poll_id).delete()
+        self.assertIsNone(RENDERED_CHOICES.get(poll_id))
+
+    def test_purge(self):
+        poll_id, other_id = self.make_poll(3, 4), self.make_poll(2, 2)
+        PollMessage.objects.create(poll_id=poll_id, channel="C1", ts="1.1")
+        Poll.objects.get(id=poll_id).get_slack_blocks()
+
+        # One DELETE per table, between a SAVEPOINT and its RELEASE
+        with self.assertNumQueries(6):
+            self.assertEqual(1, Poll.purge([poll_id]))
+
+        self.assertIsNone(RENDERED_CHOICES.get(poll_id))
+        self.assertFalse(Choice.objects.filter(poll_id=poll_id).exists())
+        self.assertFalse(PollMessage.objects.exists())
+        self.assertEqual(4, UserChoice.objects.count())
+        self.assertEqual(2, Choice.objects.filter(poll_id=other_id).count())
+
+    @override_settings(POLL_VOTERS_SHOWN=3)
+    def test_render_hides_extra_voters(self):
+        poll_id = self.make_poll(2, 5)
+        self.assertRenderQueries(poll_id, 3)
+        blocks = json.loads(Poll.objects.get(id=poll_id).slack_blocks)
+
+        choice_id = Choice.objects.get(poll_id=poll_id, index=0).id
+        self.assertTrue(blocks[2]["text"]["text"].endswith("<@U2> and 2 others"))
+        self.assertEqual("polls.choice_menu", blocks[2]["accessory"]["action_id"])
+        self.assertEqual(
+            [f"vote:{choice_id}", f"voters:{choice_id}"],
+            [option["value"] for option in blocks[2]["accessory"]["options"]],
+        )
+        self.assertTrue(blocks[3]["text"]["text"].startswith(":two:"))
+
+    @override_settings(POLL_VOTERS_SHOWN=1)
+    def test_large_poll_fits_in_a_message(self):
+        poll_id = self.make_poll(24, 2, open_choice=True, visible_results=False)
+        blocks = json.loads(Poll.objects.get(id=poll_id).slack_blocks)
+
+        self.assertLessEqual(len(blocks), MAX_BLOCKS)
+
+    def test_voters_pages(self):
+        choice = Poll.objects.get(id=self.make_poll(1, 20)).choices.get()
+        pages, after = [], None
+        while True:
+            voters, after = UserChoice.get_voters_page(choice.id, after, 6)
+            pages.append(voters)
+            if after is None:
+                break
+
+        self.assertEqual([6, 6, 6, 2], list(map(len, pages)))
+        self.assertEqual([u.slack_username for u in self.users], sum(pages, []))
+
+    def test_render_is_deterministic(self):
+        poll_id = self.make_poll(2, 2)
+        rendered = Poll.objects.get(id=poll_id).slack_blocks
+        self.assertEqual(rendered, Poll.objects.get(id=poll_id).slack_blocks)
+
+        block_ids = [block["block_id"] for block in json.loads(rendered)]
+        self.assertEqual(len(block_ids), len(set(block_ids)))
+        self.assertTrue(all(b.startswith(f"poll-{poll_id}.") for b in block_ids[:-1]))
+
+        Poll.objects.get(id=poll_id).choices.get(index=0).toggle_vote("U5")
+        updated = json.loads(Poll.objects.get(id=poll_id).slack_blocks)
+        self.assertNotEqual(block_ids[2], updated[2]["block_id"])
+        self.assertEqual(block_ids[3], updated[3]["block_id"])
+
+
+class TestVoteCounters(TestCase):
+    def setUp(self):
+        team = Team.objects.create(id="T1", domain="team")
+        channel = Channel.objects.create(id="C1", name="general", team=team)
+        self.user = User.objects.create(id="U1", name="user", team=team)
+        self.poll = Poll.objects.create(name="Poll", creator=self.user, channel=channel)
+        self.choices = [
+            self.poll.choices.create(index=i, text=f"{i}") for i in range(2)
+        ]
+
+    def assertCounts(self, poll_count, *choice_counts):
+        self.poll.refresh_from_db()
+        self.assertEqual(poll_count, self.poll.vote_count)
+        self.assertEqual(
+            list(choice_counts),
+            list(
+                self.poll.choices.order_by("index").values_list("vote_count", flat=True)
+            ),
+        )
+
+    def test_counters_follow_votes(self):
+        self.assertTrue(self.choices[0].toggle_vote(self.user.id))
+        self.assertTrue(self.choices[1].toggle_vote(self.user.id))
+        self.assertCounts(2, 1, 1)
+
+        self.assertFalse(self.choices[0].toggle_vote(self.user.id))
+        self.assertCounts(1, 0, 1)
+
+    def test_unique_choice_vote(self):
+        self.choices[0].toggle_vote(self.user.id, unique_choice=True)
+        self.assertCounts(1, 1, 0)
+
+        # The poll total does not change
+        with self.assertNumQueries(4):
+            self.assertTrue(self.choices[1].toggle_vote(self.user.id, True))
+        self.assertCounts(1, 0, 1)
+        self.assertEqual(
+            [self.choices[1].id],
+            list(UserChoice.objects.values_list("choice_id", flat=True)),
+        )
+
+        with self.assertNumQueries(3):
+            self.assertFalse(self.choices[1].toggle_vote(self.user.id, True))
+        self.assertCounts(0, 0, 0)
+
+    def test_repair(self):
+        self.choices[0].voters.add(self.user)
+        self.assertCounts(0, 0, 0)
+
+        call_command("repair_vote_counts", stdout=StringIO())
+        self.assertCounts(1, 1, 0)
+
+
+class TestPollUpdates(TestCase):
+    def setUp(self):
+        team = Team.objects.create(id="T1", domain="team")
+        channel = Channel.objects.create(id="C1", name="general", team=team)
+        user = User.objects.create(id="U1", name="user", team=team)
+        self.poll = Poll.objects.create(name="Poll", creator=user, channel=channel)
+
+    def test_update_is_versioned(self):
+        client = Mock()
+        with override_settings(SLACK_CLIENT=client):
+            request_poll_update(self.poll, "C1", "1.1", delay=0)
+            self.poll.choices.create(index=0, text="Choice")
+            request_poll_update(self.poll, "C1", "1.1", delay=0)
+            flush_poll_message("C1", "1.1")
+
+        self.assertEqual(2, client.chat_update.call_count)
+        message = PollMessage.objects.get()
+        self.assertEqual(2, message.version)
+        self.assertEqual(2, message.rendered_version)
+        self.assertIsNone(message.sending_since)
+
+    def test_unchanged_update_is_not_sent(self):
+        client = Mock()
+        choice = self.poll.choices.create(index=0, text="Choice")
+        with override_settings(SLACK_CLIENT=client):
+            request_poll_update(self.poll, "C1", "1.1", delay=0)
+            choice.toggle_vote("U1")
+            choice.toggle_vote("U1")
+            request_poll_update(self.poll, "C1", "1.1", delay=0)
+
+        client.chat_update.assert_called_once()
+        message = PollMessage.objects.get()
+        self.assertEqual(2, message.rendered_version)
+        self.assertEqual(self.poll.render_slack_blocks()[1], message.fingerprint)
+
+    def test_update_skipped_while_sending(self):
+        client = Mock()
+        PollMessage.objects.create(
+            poll=self.poll, channel="C1", ts="1.1", sending_since=timezone.now()
+        )
+        with override_settings(SLACK_CLIENT=client):
+            request_poll_update(self.poll, "C1", "1.1", delay=0)
+
+        client.chat_update.assert_not_called()
+        self.assertEqual(1, PollMessage.objects.get().version)
+
+
+class TestAddChoice(TestCase):
+    def setUp(self):
+        team = Team.objects.create(id="T1", domain="team")
+        channel = Channel.objects.create(id="C1", name="general", team=team)
+        user = User.objects.create(id="U1", name="user", team=team)
+        self.poll = Poll.objects.create(name="Poll", creator=user, channel=channel)
+
+    def test_add_choice_after_the_last(self):
+        self.assertEqual(0, self.poll.add_choice("A").index)
+        self.poll.choices.create(index=4, text="B")
+        self.assertEqual(5, self.poll.add_choice("C").index)
+
+    def test_add_choice_retries_on_conflict(self):
+        self.poll.choices.create(index=0, text="A")
+        # The first read misses a choice added concurrently
+        stale_indexes = [{"index": -1}, {"index": 0}]
+        with patch.object(QuerySet, "aggregate", side_effect=stale_indexes):
+            choice = self.poll.add_choice("B")
+
+        self.assertEqual(1, choice.index)
+        self.assertEqual(2, self.poll.choices.count())
+
+
+class TestCreatePoll(TransactionTestCase):
+    def setUp(self):
+        clear_identity_maps()
+        team = Team.objects.create(id="T1", domain="team")
+        Channel.objects.create(id="C1", name="general", team=team)
+        User.objects.create(id="U1", name="user", team=team)
+        self.state = SlackState(
+            team_id="T1",
+            user_id="U1",
+            channel_id="C1",
+            type="command",
+            command="/poll",
+            text="",
+            payload={},
+        )
+
+    def test_poll_is_posted_after_commit(self):
+        client = Mock()
+        client.chat_postMessage.return_value = {"channel": "C1", "ts": "1.1"}
+        with override_settings(SLACK_CLIENT=client):
+            create_poll(self.state, "Poll", ["1", "2"], [])
+
+        client.chat_postMessage.assert_called_once()
+        self.assertEqual("1.1", PollMessage.objects.get().ts)
+
+    def test_poll_is_deleted_if_refused(self):
+        client = Mock()
+        client.chat_postMessage.side_effect = SlackApiError("refused", {})
+        with override_settings(SLACK_CLIENT=client):
+            with self.assertRaises(SlackApiError):
+                create_poll(self.state, "Poll", ["1", "2"], [])
+
+        self.assertFalse(Poll.objects.exists())
+
+    def test_delete_purges_after_notifying(self):
+        client = Mock()
+        poll = Poll.objects.create(name="Poll", creator_id="U1", channel_id="C1")
+        poll.choices.create(index=0, text="1").toggle_vote("U1")
+        self.state.text = str(poll.id)
+        with override_settings(SLACK_CLIENT=client):
+            delete(self.state)
+
+        client.chat_delete.assert_called_once()
+        self.assertFalse(Poll.objects.exists())
+        self.assertFalse(UserChoice.objects.exists())
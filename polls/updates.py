@@ -0,0 +1,102 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from polls.models import Poll, PollMessage
+
+logger = logging.getLogger("slackbot")
+
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def request_poll_update(
+    poll: Poll, channel_id: str, ts: str, delay: Optional[float] = None
+):
+    """
+    Mark the message `ts` showing `poll` as outdated, and update it after `delay`
+    seconds (POLL_UPDATE_DELAY by default).
+    All the changes made in the meantime, by any process, are sent in one update.
+    Must be called once the changes are committed.
+    """
+    if delay is None:
+        delay = settings.POLL_UPDATE_DELAY
+
+    messages = PollMessage.objects.filter(channel=channel_id, ts=ts)
+    if not messages.update(version=F("version") + 1):
+        try:
+            with transaction.atomic():
+                PollMessage.objects.create(
+                    poll=poll, channel=channel_id, ts=ts, version=1
+                )
+        except IntegrityError:
+            messages.update(version=F("version") + 1)
+
+    if delay <= 0:
+        return flush_poll_message(channel_id, ts)
+
+    key = (channel_id, ts)
+    with _pending_lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+    threading.Timer(delay, _flush_later, key).start()
+
+
+def _flush_later(channel_id: str, ts: str):
+    with _pending_lock:
+        _pending.discard((channel_id, ts))
+    close_old_connections()
+    try:
+        flush_poll_message(channel_id, ts)
+    except Exception:
+        logger.exception(f"Could not update poll message {ts} in {channel_id}")
+    finally:
+        connection.close()
+
+
+def flush_poll_message(channel_id: str, ts: str):
+    """
+    Send the latest render of the message if it is outdated.
+    Does nothing if another process is already sending it: that process checks
+    for new changes once it is done, and sends them in order.
+    """
+    messages = PollMessage.objects.filter(channel=channel_id, ts=ts)
+    while True:
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.POLL_UPDATE_LEASE)
+        claimed = (
+            messages.filter(version__gt=F("rendered_version"))
+            .filter(Q(sending_since__isnull=True) | Q(sending_since__lt=stale))
+            .update(sending_since=now)
+        )
+        if not claimed:
+            return
+
+        try:
+            message = messages.select_related("poll__creator").get()
+            # The render may include changes newer than this version, never older
+            version = message.version
+            blocks, fingerprint = message.poll.render_slack_blocks()
+            if fingerprint == message.fingerprint:
+                logger.debug(f"Poll message {ts} in {channel_id} is unchanged")
+            else:
+                logger.debug(
+                    settings.SLACK_CLIENT.chat_update(
+                        ts=ts,
+                        text=f"Poll: {message.poll.name}",
+                        channel=channel_id,
+                        blocks=blocks,
+                    )
+                )
+            messages.filter(rendered_version__lt=version).update(
+                rendered_version=version, fingerprint=fingerprint
+            )
+        finally:
+            messages.filter(sending_since=now).update(sending_since=None)
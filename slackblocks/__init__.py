@@ -1,4 +1,15 @@
 from .blocks import *
 from .elements import *
+from .serialization import (
+    fingerprint_blocks,
+    make_block_id,
+    resolve_block,
+    resolve_blocks,
+    serialize_blocks,
+    serialize_pages,
+    to_json,
+)
+from .pagination import MAX_BLOCKS, MAX_SECTION_TEXT, split_sections, split_text
+from .templates import BlockTemplate, hole, join_blocks
 
 name = "slackblocks"
@@ -2,9 +2,9 @@ from abc import abstractmethod, ABC
 from enum import Enum
 from json import dumps
 from typing import Any, Dict, List, Optional, Union
-from uuid import uuid4
 from slackblocks.elements import Element, ElementType, Text, TextType
 from slackblocks.errors import InvalidUsageError
+from slackblocks.serialization import resolve_blocks, to_json
 
 
 class BlockType(Enum):
@@ -26,24 +26,37 @@ class Block(ABC):
     """
     Basis block containing attributes and behaviour common to all blocks.
     N.B: Block is an abstract class and cannot be sent directly.
+    Blocks without a block_id get a deterministic one when they are serialized.
+    Blocks use __slots__, like elements.
     """
 
+    __slots__ = ("type", "type_value", "block_id")
+
     def __init__(self, type_: BlockType, block_id: Optional[str] = None):
         self.type = type_
-        self.block_id = block_id if block_id else str(uuid4())
+        self.type_value = type_.value
+        self.block_id = block_id
 
     def __add__(self, other: "Block"):
         return [self, other]
 
     def _attributes(self):
-        return {"type": self.type.value, "block_id": self.block_id}
+        if self.block_id is None:
+            return {"type": self.type_value}
+        return {"type": self.type_value, "block_id": self.block_id}
 
     @abstractmethod
     def _resolve(self) -> Dict[str, any]:
         pass
 
+    def to_json(self) -> str:
+        """
+        Compact JSON of the block, to send it to Slack.
+        """
+        return to_json(resolve_blocks(self)[0])
+
     def __repr__(self) -> str:
-        return dumps(self._resolve(), indent=4)
+        return dumps(resolve_blocks(self)[0], indent=4)
 
 
 class SectionBlock(Block):
@@ -54,6 +67,8 @@ class SectionBlock(Block):
     or side-by-side with any of the available block elements.
     """
 
+    __slots__ = ("text", "fields", "accessory")
+
     def __init__(
         self,
         text: Union[str, Text],
@@ -62,7 +77,8 @@ class SectionBlock(Block):
         accessory: Optional[Element] = None,
     ):
         super().__init__(type_=BlockType.SECTION, block_id=block_id)
-        self.text = Text.to_text(text, max_length=3000)
+        # Longer texts are split into several sections when serialized
+        self.text = Text.to_text(text)
         self.fields = fields
         self.accessory = accessory
 
@@ -83,6 +99,8 @@ class DividerBlock(Block):
     a message. The divider block is nice and neat, requiring only a type.
     """
 
+    __slots__ = ()
+
     def __init__(self, block_id: Optional[str] = None):
         super().__init__(type_=BlockType.DIVIDER, block_id=block_id)
 
@@ -96,6 +114,8 @@ class ImageBlock(Block):
     A simple image block, designed to make those cat photos really pop.
     """
 
+    __slots__ = ("image_url", "alt_text", "title")
+
     def __init__(
         self,
         image_url: str,
@@ -127,6 +147,8 @@ class ActionsBlock(Block):
     A block that is used to hold interactive elements.
     """
 
+    __slots__ = ("elements",)
+
     def __init__(
         self, elements: Union[List[Element], Element], block_id: Optional[str] = None,
     ):
@@ -147,6 +169,8 @@ class ContextBlock(Block):
     Displays message context, which can include both images and text.
     """
 
+    __slots__ = ("elements",)
+
     def __init__(
         self,
         elements: Union[List[Element], Element, str],
@@ -180,6 +204,8 @@ class FileBlock(Block):
     Displays a remote file.
     """
 
+    __slots__ = ("external_id", "source")
+
     def __init__(self, external_id: str, source: str, block_id: Optional[str]):
         super().__init__(type_=BlockType.FILE, block_id=block_id)
         self.external_id = external_id
@@ -197,6 +223,8 @@ class InputBlock(Block):
     Usable only on modals
     """
 
+    __slots__ = ("label", "element", "hint", "optional")
+
     def __init__(
         self,
         label: Union[Text, str],
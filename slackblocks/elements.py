@@ -3,6 +3,7 @@ from enum import Enum
 from json import dumps
 from typing import Any, Dict, Optional, Union, List
 from slackblocks.errors import InvalidUsageError
+from slackblocks.serialization import to_json
 
 
 class ElementType(Enum):
@@ -48,19 +49,30 @@ class Element(ABC):
     """
     Basis element containing attributes and behaviour common to all elements.
     N.B: Element is an abstract class and cannot be used directly.
+    Elements use __slots__, and keep the value of their type to skip the Enum
+    lookup when they are resolved.
     """
 
+    __slots__ = ("type", "type_value")
+
     def __init__(self, type_: ElementType):
         super().__init__()
         self.type = type_
+        self.type_value = type_.value
 
     def _attributes(self) -> Dict[str, Any]:
-        return {"type": self.type.value}
+        return {"type": self.type_value}
 
     @abstractmethod
     def _resolve(self) -> Dict[str, Any]:
         pass
 
+    def to_json(self) -> str:
+        """
+        Compact JSON of the element, to send it to Slack.
+        """
+        return to_json(self._resolve())
+
     def __repr__(self) -> str:
         return dumps(self._resolve(), indent=4)
 
@@ -71,6 +83,8 @@ class Text(Element):
     Slack's "mrkdwn"
     """
 
+    __slots__ = ("text_type", "text_type_value", "text", "verbatim", "emoji")
+
     def __init__(
         self,
         text: str,
@@ -80,20 +94,21 @@ class Text(Element):
     ):
         super().__init__(type_=ElementType.TEXT)
         self.text_type = type_
+        self.text_type_value = type_.value
         self.text = text
-        if self.text_type == TextType.MARKDOWN:
+        if self.text_type is TextType.MARKDOWN:
             self.verbatim = verbatim
             self.emoji = None
-        elif self.text_type == TextType.PLAINTEXT:
+        elif self.text_type is TextType.PLAINTEXT:
             self.verbatim = None
             self.emoji = emoji
 
     def _resolve(self) -> Dict[str, Any]:
         text = {
-            "type": self.text_type.value,
+            "type": self.text_type_value,
             "text": self.text,
         }
-        if self.text_type == TextType.MARKDOWN:
+        if self.text_type is TextType.MARKDOWN:
             text["verbatim"] = self.verbatim
         elif self.type == TextType.PLAINTEXT and self.emoji:
             text["emoji"] = self.emoji
@@ -113,6 +128,8 @@ class Text(Element):
         else:
             if max_length and len(text.text) > max_length:
                 raise InvalidUsageError("Text length exceeds Slack-imposed limit")
+            if text.text_type is type_:
+                return text
             return Text(text=text.text, type_=type_)
 
     def __str__(self) -> str:
@@ -124,6 +141,8 @@ class Option(Element):
     Option for select
     """
 
+    __slots__ = ("text", "value", "description", "url")
+
     def __init__(
         self,
         text: Union[str, Text],
@@ -157,6 +176,8 @@ class Image(Element):
     you're looking for the image block.
     """
 
+    __slots__ = ("image_url", "alt_text")
+
     def __init__(self, image_url: str, alt_text: str):
         super().__init__(type_=ElementType.IMAGE)
         self.image_url = image_url
@@ -176,6 +197,8 @@ class Confirm(Element):
     their action by offering confirm and deny buttons.
     """
 
+    __slots__ = ("title", "text", "confirm", "deny")
+
     def __init__(
         self,
         title: Union[str, Text],
@@ -209,6 +232,8 @@ class Button(Element):
     workflow.
     """
 
+    __slots__ = ("text", "action_id", "url", "value", "style", "confirm")
+
     def __init__(
         self,
         text: Union[str, Text],
@@ -246,6 +271,8 @@ class Datepicker(Element):
     Datepicker
     """
 
+    __slots__ = ("action_id", "placeholder", "initial_date", "confirm")
+
     def __init__(
         self,
         action_id: str,
@@ -280,6 +307,8 @@ class Overflow(Element):
     Overflow
     """
 
+    __slots__ = ("action_id", "options", "confirm")
+
     def __init__(
         self, action_id: str, options: List[Option], confirm: Optional[Confirm] = None
     ):
@@ -303,6 +332,15 @@ class TextInput(Element):
     Text input
     """
 
+    __slots__ = (
+        "action_id",
+        "placeholder",
+        "initial_value",
+        "multiline",
+        "min_length",
+        "max_length",
+    )
+
     def __init__(
         self,
         action_id: str,
@@ -346,6 +384,8 @@ class RadioButton(Element):
     Radio buttons
     """
 
+    __slots__ = ("action_id", "options", "initial_option", "confirm")
+
     def __init__(
         self,
         action_id: str,
@@ -375,6 +415,8 @@ class Checkboxes(Element):
     Usable only in modals and home
     """
 
+    __slots__ = ("action_id", "options", "initial_options", "confirm")
+
     def __init__(
         self,
         action_id: str,
@@ -406,6 +448,16 @@ class StaticSelect(Element):
     Static select
     """
 
+    __slots__ = (
+        "placeholder",
+        "action_id",
+        "options",
+        "initial_option",
+        "min_query_length",
+        "confirm",
+        "multi",
+    )
+
     def __init__(
         self,
         placeholder: Union[str, Text],
@@ -450,6 +502,15 @@ class ExternalSelect(Element):
     External select
     """
 
+    __slots__ = (
+        "placeholder",
+        "action_id",
+        "initial_option",
+        "min_query_length",
+        "confirm",
+        "multi",
+    )
+
     def __init__(
         self,
         placeholder: Union[str, Text],
@@ -491,6 +552,8 @@ class UserSelect(Element):
     User select
     """
 
+    __slots__ = ("placeholder", "action_id", "initial_user", "confirm", "multi")
+
     def __init__(
         self,
         placeholder: Union[str, Text],
@@ -528,6 +591,8 @@ class ConversationSelect(Element):
     Conversation select
     """
 
+    __slots__ = ("placeholder", "action_id", "initial_conversation", "confirm", "multi")
+
     def __init__(
         self,
         placeholder: Union[str, Text],
@@ -565,6 +630,8 @@ class ChannelSelect(Element):
     Conversation select
     """
 
+    __slots__ = ("placeholder", "action_id", "initial_channel", "confirm", "multi")
+
     def __init__(
         self,
         placeholder: Union[str, Text],
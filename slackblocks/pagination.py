@@ -0,0 +1,90 @@
+from typing import Any, Dict, List
+
+# Limits of Slack on messages
+MAX_BLOCKS = 50
+MAX_SECTION_TEXT = 3000
+
+CODE_FENCE = "```"
+
+
+def split_text(text: str, max_length: int = MAX_SECTION_TEXT) -> List[str]:
+    """
+    Split `text` into chunks of at most `max_length` characters, preferably on
+    line breaks, then on spaces.
+    Code blocks are split into several code blocks.
+    """
+    if len(text) <= max_length:
+        return [text]
+
+    fence = len(CODE_FENCE)
+    if (
+        text.startswith(CODE_FENCE)
+        and text.endswith(CODE_FENCE)
+        and len(text) > 2 * fence
+    ):
+        return [
+            f"{CODE_FENCE}{chunk}{CODE_FENCE}"
+            for chunk in split_text(text[fence:-fence], max_length - 2 * fence)
+        ]
+
+    chunks = []
+    while len(text) > max_length:
+        cut = text.rfind("\n", 1, max_length + 1)
+        if cut == -1:
+            cut = text.rfind(" ", 1, max_length + 1)
+        if cut == -1:
+            chunks.append(text[:max_length])
+            text = text[max_length:]
+        else:
+            # The separator is dropped, but not the indentation after it
+            chunks.append(text[:cut])
+            text = text[cut + 1 :]
+    chunks.append(text)
+    return chunks
+
+
+def split_sections(
+    resolved: List[Dict[str, Any]], max_length: int = MAX_SECTION_TEXT
+) -> List[Dict[str, Any]]:
+    """
+    Replace the resolved sections whose text is too long by several sections.
+    The first one keeps the id and the accessory of the original section, the
+    next ones get the id suffixed with their rank.
+    """
+    if not any(_is_long_section(block, max_length) for block in resolved):
+        return resolved
+
+    blocks = []
+    for block in resolved:
+        if not _is_long_section(block, max_length):
+            blocks.append(block)
+            continue
+        text = block["text"]
+        for rank, chunk in enumerate(split_text(text["text"], max_length)):
+            if rank == 0:
+                blocks.append({**block, "text": {**text, "text": chunk}})
+                continue
+            section = {"type": "section", "text": {**text, "text": chunk}}
+            if "block_id" in block:
+                section["block_id"] = f"{block['block_id']}.{rank}"
+            blocks.append(section)
+    return blocks
+
+
+def _is_long_section(block: Dict[str, Any], max_length: int) -> bool:
+    return (
+        block.get("type") == "section"
+        and "text" in block
+        and len(block["text"]["text"]) > max_length
+    )
+
+
+def paginate(
+    resolved: List[Dict[str, Any]], max_blocks: int = MAX_BLOCKS
+) -> List[List[Dict[str, Any]]]:
+    """
+    Split the resolved blocks of a message into pages of at most `max_blocks`.
+    """
+    if len(resolved) <= max_blocks:
+        return [resolved]
+    return [resolved[i : i + max_blocks] for i in range(0, len(resolved), max_blocks)]
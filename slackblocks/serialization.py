@@ -0,0 +1,85 @@
+from hashlib import blake2b
+from json import dumps
+from typing import Any, Dict, List, Optional
+
+from slackblocks.pagination import paginate, split_sections
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def make_block_id(
+    resolved: Dict[str, Any], position: int, namespace: Optional[str] = None
+) -> str:
+    """
+    Stable id of a resolved block, derived from its position and content.
+    The same block at the same position always gets the same id, and the id
+    changes with the content, so Slack never reuses the state of an older block.
+    """
+    digest = blake2b(to_json(resolved).encode(), digest_size=6).hexdigest()
+    prefix = f"{namespace}." if namespace else ""
+    return f"{prefix}{position}.{digest}"
+
+
+def resolve_block(block, position: int, namespace: Optional[str] = None):
+    """
+    Resolve a block (or element) at `position` in its message.
+    Dicts are considered already resolved and kept as is.
+    Blocks without an explicit block_id get one from `make_block_id`.
+    """
+    if isinstance(block, dict):
+        return block
+    resolved = block._resolve()
+    if hasattr(block, "block_id") and "block_id" not in resolved:
+        block_id = make_block_id(resolved, position, namespace)
+        resolved = {"type": resolved["type"], "block_id": block_id, **resolved}
+    return resolved
+
+
+def resolve_blocks(blocks, namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Resolve a block (or element), or a list of them, into the dicts sent to Slack.
+    """
+    if not isinstance(blocks, (list, tuple)):
+        blocks = [blocks]
+    return [
+        resolve_block(block, position, namespace)
+        for position, block in enumerate(blocks)
+    ]
+
+
+def to_json(resolved: Any) -> str:
+    """
+    Compact JSON encoding of resolved blocks, with orjson if it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(resolved).decode()
+    return dumps(resolved, separators=(",", ":"), ensure_ascii=False)
+
+
+def fingerprint_blocks(resolved: List[Dict[str, Any]], ignore=()) -> str:
+    """
+    Digest of the resolved blocks, leaving out the blocks whose id is in `ignore`.
+    Two renders with the same fingerprint show the same content.
+    """
+    content = [block for block in resolved if block.get("block_id") not in ignore]
+    return blake2b(to_json(content).encode(), digest_size=16).hexdigest()
+
+
+def serialize_blocks(blocks, namespace: Optional[str] = None) -> str:
+    """
+    The payload to send to Slack for a list of blocks.
+    Sections with a text too long for Slack are split into several sections.
+    """
+    return to_json(split_sections(resolve_blocks(blocks, namespace)))
+
+
+def serialize_pages(blocks, namespace: Optional[str] = None) -> List[str]:
+    """
+    The payloads of the messages needed to send a list of blocks, each of them
+    within the limits of Slack.
+    """
+    resolved = split_sections(resolve_blocks(blocks, namespace))
+    return [to_json(page) for page in paginate(resolved)]
@@ -0,0 +1,61 @@
+import re
+from typing import Optional
+
+from slackblocks.errors import InvalidUsageError
+from slackblocks.serialization import resolve_blocks, to_json
+
+HOLE_START = "\x1e"
+HOLE_END = "\x1f"
+
+# Holes as they appear once the resolved blocks are encoded in JSON
+_HOLE_PATTERN = re.compile(r"\\u001e(\w+)\\u001f")
+
+
+def hole(name: str) -> str:
+    """
+    Placeholder for the value `name` of a template, to use in place of any string
+    given to a block or an element (text, value, block_id, url...).
+    """
+    return f"{HOLE_START}{name}{HOLE_END}"
+
+
+class BlockTemplate:
+    """
+    Blocks resolved and encoded once, whose holes are filled on each render.
+    Rendering costs a string join, whatever the size of the block tree.
+    N.B: the holes are filled with strings, and the optional attributes of the
+    blocks cannot depend on them. Values are not checked against Slack limits.
+    """
+
+    __slots__ = ("parts", "holes")
+
+    def __init__(self, blocks, namespace: Optional[str] = None):
+        skeleton = to_json(resolve_blocks(blocks, namespace))[1:-1]
+        # Literal JSON at even indexes, and hole names at odd indexes
+        self.parts = tuple(_HOLE_PATTERN.split(skeleton))
+        self.holes = frozenset(self.parts[1::2])
+
+    def fill(self, **values) -> str:
+        """
+        The blocks with their holes filled, as JSON array items.
+        """
+        missing = self.holes.difference(values)
+        if missing:
+            raise InvalidUsageError(f"Missing template values: {sorted(missing)}")
+        parts = list(self.parts)
+        for i in range(1, len(parts), 2):
+            parts[i] = to_json(str(values[parts[i]]))[1:-1]
+        return "".join(parts)
+
+    def render(self, **values) -> str:
+        """
+        The payload of the blocks with their holes filled.
+        """
+        return f"[{self.fill(**values)}]"
+
+
+def join_blocks(*fragments: str) -> str:
+    """
+    The payload of several filled templates, in order.
+    """
+    return f"[{','.join(fragment for fragment in fragments if fragment)}]"
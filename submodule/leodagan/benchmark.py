@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Measure the time Léodagan takes to check news with large bodies
+"""
+
+import argparse
+import time
+import leodagan.engine as lengine
+
+HEADERS = "From: Bench <bench@example.com>\nSubject: [BENCH][PERF] Large body\n\n"
+
+PARAGRAPH = [
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod",
+    "tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim",
+    "veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip.",
+    "",
+    "Le date machin a écrit:",
+    "> Duis aute irure dolor in reprehenderit in voluptate velit esse cillum",
+    ">> dolore eu fugiat nulla pariatur, excepteur sint occaecat cupidatat non",
+    "",
+    "[1] https://example.com/a/very/long/link/that/is/allowed/to/exceed/the/limit",
+    "",
+]
+
+def make_news(nb_lines: int) -> str:
+    """
+        A compliant news whose body has about `nb_lines` lines
+    """
+    body = ["Bonjour,", ""]
+    while len(body) < nb_lines:
+        body.extend(PARAGRAPH)
+    body.extend(["Cordialement,", "", "-- ", "bench"])
+    return HEADERS + "\n".join(body)
+
+def main():
+    # pylint: disable=missing-docstring
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=20, help="Checks per size")
+    parser.add_argument('sizes', metavar='lines', type=int, nargs='*',
+                        default=[100, 1000, 10000, 100000], help="Lines of the bodies")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        content = make_news(size)
+        violations = lengine.check(content)
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            lengine.check(content)
+        elapsed = (time.perf_counter() - start) / args.rounds
+        print(f"{size} lines: {elapsed * 1000:.3f}ms per news, "
+              f"{elapsed / size * 1e6:.3f}us per line, {len(violations)} violations")
+
+if __name__ == "__main__":
+    main()
@@ -7,18 +7,23 @@
 """
 
 import leodagan.settings as ls
+import leodagan.batch as lbatch
 import leodagan.file as lf
 import leodagan.stdin as lin
 
 def main():
     # pylint: disable=missing-docstring
-    ls.arg_parse()
-    if ls.settings.files:
-        if lf.run_files(ls.settings.files):
+    config = ls.arg_parse()
+    if config.batch:
+        if lbatch.run_batch(config.files, config):
+            exit(0)
+        exit(1)
+    if config.files:
+        if lf.run_files(config.files, config):
             exit(0)
         exit(1)
     else:
-        lin.read_input()
+        lin.read_input(config)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Check whole directories and archives of news, on a pool of processes
+"""
+
+import os
+import sys
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import leodagan.settings as ls
+import leodagan.engine as lengine
+
+# News sent to a worker at once, to amortize the cost of the transfers
+CHUNK_SIZE = 64
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+def walk_archive(path: str):
+    """
+        Yield the members of a tar or zip archive as (identification, None, content)
+    """
+    if path.endswith(TAR_SUFFIXES):
+        with tarfile.open(path) as archive:
+            for member in archive:
+                if member.isfile():
+                    content = archive.extractfile(member).read()
+                    yield f"{path}:{member.name}", None, content
+    else:
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.infolist():
+                if not member.is_dir():
+                    yield f"{path}:{member.filename}", None, archive.read(member)
+
+def walk(paths: list):
+    """
+        Yield the news found under the paths as (identification, file path, content)
+        The content is only read here for the members of archives, the workers
+        read the files themselves. An unreadable archive is yielded without path
+        nor content. The order is deterministic.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield from walk([os.path.join(root, name)])
+        elif path.endswith(TAR_SUFFIXES) or path.endswith(".zip"):
+            try:
+                yield from walk_archive(path)
+            except (OSError, tarfile.TarError, zipfile.BadZipFile):
+                yield path, None, None
+        else:
+            yield path, path, None
+
+def check_chunk(chunk: list, config: ls.Config) -> list:
+    """
+        Process the news of a chunk, in a worker
+        Return a report for each one, or None if it cannot be read
+    """
+    reports = []
+    for identification, path, content in chunk:
+        try:
+            if path is not None:
+                with open(path, "r") as f:
+                    content = f.read()
+            elif content is not None:
+                content = content.decode()
+            else:
+                raise FileNotFoundError(identification)
+        except (FileNotFoundError, PermissionError, UnicodeDecodeError, IsADirectoryError):
+            reports.append(None)
+            continue
+        reports.append(lengine.process_news(content, config, identification))
+    return reports
+
+def chunks(news, size: int):
+    """
+        Group the news in lists of `size` items
+    """
+    chunk = []
+    for item in news:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def check_all(paths: list, config: ls.Config):
+    """
+        Yield (identification, report) for each news under the paths, in order
+        At most a few chunks per worker are pending, so that the archives are not
+        entirely loaded in memory.
+    """
+    jobs = config.jobs or os.cpu_count() or 1
+    check = partial(check_chunk, config=config)
+    if jobs == 1:
+        for chunk in chunks(walk(paths), CHUNK_SIZE):
+            yield from zip((item[0] for item in chunk), check(chunk))
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for chunk in chunks(walk(paths), CHUNK_SIZE):
+            pending.append((chunk, executor.submit(check, chunk)))
+            if len(pending) >= 4 * jobs:
+                chunk, future = pending.popleft()
+                yield from zip((item[0] for item in chunk), future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip((item[0] for item in chunk), future.result())
+
+def run_batch(paths: list, config: ls.Config = ls.DEFAULT_CONFIG):
+    """
+        Run léodagan on every news under the paths, and print the statistics of
+        each author
+        Return whether all the news respect the nétiquette
+    """
+    all_compliant = True
+    # Author: [news passed, news failed]
+    stats = {}
+    for identification, report in check_all(paths, config):
+        if report is None:
+            if config.ignore_missing_file:
+                ls.logger.warning(f"Unreadable file : {identification} ... skipping")
+                continue
+            ls.logger.error(f"Unreadable file : {identification}")
+            all_compliant = False
+            continue
+
+        lengine.write_report(report, config, list_author=False, identify=True)
+        all_compliant &= report.compliant
+        if report.compliant:
+            ls.logger.info(f"File {identification} is nétiquette compliant")
+        else:
+            ls.logger.warning(f"File {identification} does not respect the nétiquette !")
+        if report.error is not None:
+            continue
+        if report.author is None:
+            print(f"Could not get author from news {identification}", file=sys.stderr)
+            continue
+        stats.setdefault(report.author, [0, 0])[not report.compliant] += 1
+
+    write_statistics(stats, config)
+    return all_compliant
+
+def write_statistics(stats: dict, config: ls.Config):
+    """
+        Print the number of news passed and failed by each author
+        With --list-success or --list-fail, only the authors who passed all their
+        news, or failed one of them, are listed
+    """
+    if config.quiet:
+        return
+    listing = config.list_success or config.list_fail
+    for author in sorted(stats):
+        passed, failed = stats[author]
+        if (config.list_success and failed) or (config.list_fail and not failed):
+            continue
+        if listing and config.verbose == 0:
+            print(author)
+        else:
+            print(f"{author}: {passed} passed, {failed} failed")
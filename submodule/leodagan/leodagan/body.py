@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    The body of a news, tokenized once into a line table shared by the rules
+"""
+
+SIGNATURE_DELIMITER = "-- "
+
+class Body():
+    """
+        The lines of a body, and their attributes computed in a single traversal
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lines = text.split("\n")
+        self.lengths = []
+        self.quote_depths = []
+        # Lines whose width may exceed the limit, in order
+        self.long_lines = []
+        # Lines which are a signature delimiter, in order
+        self.signatures = []
+        # Lines with a trailing whitespace which are not a quote or a delimiter
+        self.trailing_whitespaces = []
+
+        add_length = self.lengths.append
+        add_depth = self.quote_depths.append
+        for i, line in enumerate(self.lines):
+            length = len(line)
+            add_length(length)
+            if length > 72:
+                self.long_lines.append(i)
+            if line[:1] == ">":
+                add_depth(length - len(line.lstrip(">")))
+                continue
+            add_depth(0)
+            if line == SIGNATURE_DELIMITER:
+                self.signatures.append(i)
+            elif (length and line[-1].isspace()
+                  and not line.startswith(SIGNATURE_DELIMITER)):
+                self.trailing_whitespaces.append(i)
+
+    def __len__(self):
+        return len(self.lines)
@@ -6,7 +6,9 @@
 """
 
 import sys
+from dataclasses import dataclass
 from email.header import decode_header
+import leodagan.body as lb
 import leodagan.rules as lr
 import leodagan.exceptions as le
 import leodagan.settings as ls
@@ -69,61 +71,95 @@ class News():
     def __str__(self):
         return str(self.headers) + "\n\n" + self.body
 
-def check_wrapper(func, *args):
+@dataclass(frozen=True)
+class Violation:
     """
-        A wrapper of checker to catch the exceptions
+        A rule of the nétiquette a news does not respect
     """
-    try:
-        func(*args)
-        ls.logger.debug(f"{func} checked")
-        return False
-    except le.Leodagan as err:
-        ls.output.error(f"Léodagan: {str(err)}")
-        return True
-
-def check_wrapper_iter(func, *args):
+    type: str
+    error: str
+    section: str
+
+    @staticmethod
+    def from_error(err: le.Leodagan):
+        """
+            The violation of a rule error
+        """
+        return Violation(err.type, err.error, err.section)
+
+    def __str__(self):
+        return f"Invalid {self.type}: {self.error} / see {self.section}"
+
+@dataclass(frozen=True)
+class Report:
     """
-        A wrapper of checker to iter of rule-generator
+        The result of the processing of a news, written out by the command line
     """
-    ret_code = False
-    gen = iter(func(*args))
-    try:
-        while True:
-            try:
-                obj = gen.__next__()
-                if obj is not None:
-                    raise obj
-            except le.Leodagan as err:
-                ls.output.error(f"Léodagan: {str(err)}")
-                ret_code = True
-    except StopIteration:
-        return ret_code
-
-def process_news(content: str, identification: str = None):
+    identification: str
+    violations: tuple = ()
+    author: str = None
+    error: str = None
+
+    @property
+    def compliant(self) -> bool:
+        """
+            Whether the news was parsed and respects the nétiquette
+        """
+        return self.error is None and not self.violations
+
+def check_news(news: News, config: ls.Config = ls.DEFAULT_CONFIG) -> list:
+    """
+        Apply all the rules to a news, and return every violation found, in order
+    """
+    errors = list(lr.check_subject(news.headers.get("subject"), config))
+    body = lb.Body(news.body)
+    for rule in lr.BODY_RULES:
+        errors.extend(rule(body))
+    return [Violation.from_error(err) for err in errors]
+
+def check(content: str, config: ls.Config = ls.DEFAULT_CONFIG) -> list:
+    """
+        Check the nétiquette of a news given as text, without any output
+        Return the list of violations, empty if the news is compliant
+        Raise an exception if the news cannot be parsed
+    """
+    return check_news(News(content), config)
+
+def process_news(content: str, config: ls.Config = ls.DEFAULT_CONFIG,
+                 identification: str = None) -> Report:
     """
         Process a news with its content and apply the rules
+        Nothing is written, the output is collected in the report
     """
     try:
         news = News(content)
     except Exception as err: # FIXME
-        ls.logger.error(f"Cannot parse content : {str(err)}")
-        return False
-
-    error_found = False
-
-    error_found |= check_wrapper_iter(lr.check_subject, news.headers.get("subject"))
-    error_found |= check_wrapper(lr.check_basic_body_formatting, news.body)
-    error_found |= check_wrapper_iter(lr.check_max_cols, news.body)
-    error_found |= check_wrapper(lr.check_signature, news.body)
-    error_found |= check_wrapper(lr.check_quoting, news.body)
-
-    if (ls.settings.list_success and not error_found) or (ls.settings.list_fail and error_found):
-        user_from = news.headers.get("from", None)
-        if user_from is None:
-            print(f"Could not get author from news {identification}", file=sys.stderr)
-        elif ls.settings.verbose > 0:
-            print(f'{user_from} / {identification}')
-        else:
-            print(user_from)
+        return Report(identification, error=f"Cannot parse content : {str(err)}")
+
+    violations = tuple(check_news(news, config))
+    return Report(identification, violations, news.headers.get("from", None))
 
-    return not error_found
+def write_report(report: Report, config: ls.Config, list_author: bool = True,
+                 identify: bool = False):
+    """
+        Write the output of a processed news for the command line
+        The author is listed as requested by --list-success or --list-fail, unless
+        `list_author` is unset
+        With `identify`, each line starts with the identification of the news
+    """
+    prefix = f"{report.identification}: " if identify else ""
+    if report.error is not None:
+        ls.logger.error(f"{prefix}{report.error}")
+        return
+    for violation in report.violations:
+        ls.output.error(f"Léodagan: {prefix}{violation}")
+
+    if not list_author:
+        return
+    if (config.list_success and report.compliant) or (config.list_fail and not report.compliant):
+        if report.author is None:
+            print(f"Could not get author from news {report.identification}", file=sys.stderr)
+        elif config.verbose > 0:
+            print(f'{report.author} / {report.identification}')
+        else:
+            print(report.author)
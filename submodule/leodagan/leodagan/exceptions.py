@@ -3,6 +3,7 @@
 
 """
     Represents all the exceptions
+    The rules yield them, one per violation found, without raising them
 """
 # pylint: disable=missing-docstring
 
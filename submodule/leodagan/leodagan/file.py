@@ -8,7 +8,7 @@
 import leodagan.settings as ls
 import leodagan.engine as lengine
 
-def run_files(files: list):
+def run_files(files: list, config: ls.Config = ls.DEFAULT_CONFIG):
     """
         Run léodagan on the given files
     """
@@ -18,15 +18,17 @@ def run_files(files: list):
             with open(file_, "r") as f:
                 content = f.read()
         except (FileNotFoundError, PermissionError, UnicodeDecodeError, IsADirectoryError):
-            if ls.settings.ignore_missing_file:
+            if config.ignore_missing_file:
                 ls.logger.warning(f"Unreadable file : {file_} ... skipping")
                 continue
             ls.logger.error(f"Unreadable file : {file_} ... aborting")
             return False
 
-        is_content_compliant = lengine.process_news(content, identification=file_)
+        report = lengine.process_news(content, config, identification=file_)
+        lengine.write_report(report, config)
+        is_content_compliant = report.compliant
 
-        if not is_content_compliant and ls.settings.process_all_files:
+        if not is_content_compliant and config.process_all_files:
             ls.logger.warning(f"File {file_} does not respect the nétiquette !")
         elif not is_content_compliant:
             ls.logger.error(f"File {file_} does not respect the nétiquette !")
@@ -9,6 +9,7 @@
 import re
 from dataclasses import dataclass
 import leodagan.exceptions
+import leodagan.body as lb
 import leodagan.settings as ls
 
 
@@ -19,135 +20,134 @@ class RegexUtils:
     """
     VALID_SUBJECT = re.compile(r"^(?:Re: ?)?(?:\[[A-Z0-9-_+/]{1,10}\]){2} .*$")
     ONE_TAG = re.compile(r"^(?:Re: ?)?(?:\[[A-Z0-9-_+/]{1,10}\]){1}\s*[^\[\s].*$")
-    TRAILING_WHITESPACE = re.compile(r"^(?!>|(-- )).*\s$")
     OVER_80_ALLOWED = re.compile(r"^(?:>+ )?\[[0-9]{1,3}\] \w{2,5}://.*$")
 
-def check_subject(subject: str):
+def check_subject(subject: str, config: ls.Config = ls.DEFAULT_CONFIG):
     """
         Enforce rules about the subject line
     """
     if subject is None or subject == "":
         yield leodagan.exceptions.Subject("Empty or undefined subject", "2.1.1")
-        yield StopIteration()
+        return
     if len(subject) > 80:
         yield leodagan.exceptions.Subject("Length exceed 80 chars", "2.1.1.2")
     if subject[:4] == "Re: ":
-        yield StopIteration()
+        return
     if not RegexUtils.VALID_SUBJECT.match(subject):
         yield leodagan.exceptions.Subject("Subject must have tags and a summary", "2.1.1")
-    if ls.settings.extra_information:
+    if config.extra_information:
         if RegexUtils.ONE_TAG.match(subject):
             yield leodagan.exceptions.Subject("Subject cannot have only one tag", "2.1.1")
 
-def check_basic_body_formatting(body: str):
+def check_basic_body_formatting(body: lb.Body):
     """
         Enforce the rules about the basics of the body
     """
-    if body is None or body == "":
-        raise leodagan.exceptions.Body("Empty or undefined body", "2.2.1")
-    body = body.split("\n")
+    if body is None or body.text == "":
+        yield leodagan.exceptions.Body("Empty or undefined body", "2.2.1")
+        return
+    lines = body.lines
 
-    if len(body) < 8:
-        raise leodagan.exceptions.Body(f"A valid message has a minimum of 7 lines, as it needs at least a greeting/salutation line, a body and a signature", "2.2.1")
+    if len(lines) < 8:
+        yield leodagan.exceptions.Body(f"A valid message has a minimum of 7 lines, as it needs at least a greeting/salutation line, a body and a signature", "2.2.1")
 
-    if not '-- ' in body:
-        raise leodagan.exceptions.Body("No signature found", "2.3")
-    if body.count("-- ") > 1:
-        raise leodagan.exceptions.Body("Signature separation must be unique", "2.3")
+    if not body.signatures:
+        yield leodagan.exceptions.Body("No signature found", "2.3")
+    if len(body.signatures) > 1:
+        yield leodagan.exceptions.Body("Signature separation must be unique", "2.3")
 
     # Checking for trailing whitespace
-    for i in range(len(body)):
-        line = body[i]
-        if RegexUtils.TRAILING_WHITESPACE.match(line):
-            raise leodagan.exceptions.Body(f"Line {i} has a trailing whitespace and is not a (valid) signature delimiter", "2.2.2.5")
+    for i in body.trailing_whitespaces:
+        yield leodagan.exceptions.Body(f"Line {i} has a trailing whitespace and is not a (valid) signature delimiter", "2.2.2.5")
 
     # Check for the greeting line
-    if body[0] == '' or body[1] != '':
-        raise leodagan.exceptions.Body("No greeting line. Please note that an empty line must be inserted after the greeting line", "2.2.1.1")
-    end_body = body.index("-- ")
-    if end_body < 6 or body[end_body - 1] != '' or body[end_body - 2] == '' or body[end_body - 3] != '':
-        raise leodagan.exceptions.Body("No salutation line found. Please note that empty lines must be inserted before and after the salutation line", "2.2.1.1")
-
-def check_max_cols(body: str):
+    if lines[0] == '' or len(lines) < 2 or lines[1] != '':
+        yield leodagan.exceptions.Body("No greeting line. Please note that an empty line must be inserted after the greeting line", "2.2.1.1")
+    if not body.signatures:
+        return
+    end_body = body.signatures[0]
+    if end_body < 6 or lines[end_body - 1] != '' or lines[end_body - 2] == '' or lines[end_body - 3] != '':
+        yield leodagan.exceptions.Body("No salutation line found. Please note that empty lines must be inserted before and after the salutation line", "2.2.1.1")
+
+def check_max_cols(body: lb.Body):
     """
         Enforce the rule about the max width of a line
     """
-    body = body.split("\n")
-    i = 0
-    for line in body:
-        i += 1
-        if len(line) <= 72:
-            continue
-        elif RegexUtils.OVER_80_ALLOWED.match(line):
+    for i in body.long_lines:
+        line = body.lines[i]
+        if RegexUtils.OVER_80_ALLOWED.match(line):
             continue
-        elif len(line) > 80:
-            yield leodagan.exceptions.Body(f"Line {i} width exceeding 80 chars", "2.2.2.1")
+        elif body.lengths[i] > 80:
+            yield leodagan.exceptions.Body(f"Line {i + 1} width exceeding 80 chars", "2.2.2.1")
         elif not line[0] == '>':
-            yield leodagan.exceptions.Body(f"Line {i} width exceeding 72 chars without quoting", "2.2.2.1")
-    yield None
+            yield leodagan.exceptions.Body(f"Line {i + 1} width exceeding 72 chars without quoting", "2.2.2.1")
 
-def check_signature(body: str):
+def check_signature(body: lb.Body):
     """
         Enforce rules about the signature
     """
-    body = body.split("\n")
-    signature = []
-    body_len = len(body)
-    for i in range(body_len):
-        line = body[i]
-        if line == "-- ":
-            if i + 1 == body_len:
-                raise leodagan.exceptions.Signature("Signature musn't be empty", "2.3")
-            signature = body[i + 1:]
-    if not signature:
-        raise leodagan.exceptions.Signature("Signature not found", "2.3")
+    if not body.signatures:
+        yield leodagan.exceptions.Signature("Signature not found", "2.3")
+        return
+    start = body.signatures[-1] + 1
+    if start == len(body):
+        yield leodagan.exceptions.Signature("Signature musn't be empty", "2.3")
+        return
+    signature = body.lines[start:]
     if len(signature) > 4:
-        raise leodagan.exceptions.Signature("Signature too long", "2.3")
+        yield leodagan.exceptions.Signature("Signature too long", "2.3")
     if signature[0] == "":
-        raise leodagan.exceptions.Signature("Signature musn't start with an empty line", "2.3")
+        yield leodagan.exceptions.Signature("Signature musn't start with an empty line", "2.3")
 
-def check_quoting(body: str):
+def check_quoting(body: lb.Body):
     """
         Enforce rules about quoting people
     """
     quote_attribution_found = False
-    body = body.split("\n")
+    end = body.signatures[0] if body.signatures else len(body)
     quote_section = False
     section_i = 0
 
-    for i in range(len(body)):
-        line = body[i]
-        if line == '-- ':
-            break
-        if line != '':
+    for i in range(end):
+        line = body.lines[i]
+        length = body.lengths[i]
+        if length:
             section_i += 1
         else:
             section_i = 0
 
         # Quoting line
-        if len(line) > 0 and line[0] == '>':
+        depth = body.quote_depths[i]
+        if depth:
             if not quote_section and section_i > 2:
-                raise leodagan.exceptions.Quoting(f"Quote section must be preceded by an empty line or an attribution line (line {i})", "2.2.3.2")
+                yield leodagan.exceptions.Quoting(f"Quote section must be preceded by an empty line or an attribution line (line {i})", "2.2.3.2")
             quote_section = True
 
             # Quote attribution lookup
             if not quote_section and not quote_attribution_found:
-                if i > 0 and body[i - 1] != '':
+                if i > 0 and body.lengths[i - 1]:
                     quote_attribution_found = True
                 else:
-                    raise leodagan.exceptions.Quoting(f"Quote section must be attributed (line {i})", "2.2.3.3")
+                    yield leodagan.exceptions.Quoting(f"Quote section must be attributed (line {i})", "2.2.3.3")
 
             # Multiple quoting rules
-            for j in range(len(line)):
-                if line[j] == '>':
-                    continue
-                if line[j] == ' ':
-                    if j + 1 < len(line) and line[j + 1] == '>':
-                        raise leodagan.exceptions.Quoting(f"Quoting multiple times should use multiple `>' without spaces in between", "2.2.3.2")
-                    break
-                raise leodagan.exceptions.Quoting(f"Quoting needs a space between the last `>' and its content (line {i})", "2.2.3.2")
-
-        elif len(line) != 0 and quote_section:
-            raise leodagan.exceptions.Quoting(f"Quoting sections must be separated by empty lines (line {i})", "2.2.3.2")
-        elif len(line) == 0:
+            if depth < length:
+                if line[depth] != ' ':
+                    yield leodagan.exceptions.Quoting(f"Quoting needs a space between the last `>' and its content (line {i})", "2.2.3.2")
+                elif depth + 1 < length and line[depth + 1] == '>':
+                    yield leodagan.exceptions.Quoting(f"Quoting multiple times should use multiple `>' without spaces in between", "2.2.3.2")
+
+        elif length and quote_section:
+            yield leodagan.exceptions.Quoting(f"Quoting sections must be separated by empty lines (line {i})", "2.2.3.2")
+            # Reported once, the rest of the section is not quoted either
             quote_section = False
+        elif not length:
+            quote_section = False
+
+# The rules applied to the body of a news, in order
+BODY_RULES = (
+    check_basic_body_formatting,
+    check_max_cols,
+    check_signature,
+    check_quoting,
+)
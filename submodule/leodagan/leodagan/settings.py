@@ -8,18 +8,34 @@
 
 import argparse
 import logging
+from dataclasses import dataclass
 
-settings = None
+@dataclass(frozen=True)
+class Config:
+    """
+        The options of a run of Léodagan, given to the engine and the rules
+    """
+    quiet: bool = False
+    list_success: bool = False
+    list_fail: bool = False
+    verbose: int = 0
+    files: tuple = ()
+    process_all_files: bool = False
+    ignore_missing_file: bool = False
+    extra_information: bool = False
+    batch: bool = False
+    jobs: int = None
+
+DEFAULT_CONFIG = Config()
+
+# Only configured by the command line, the engine does not log
 logger = logging.getLogger(__name__)
 output = logging.getLogger("output")
 
-def arg_parse():
+def make_parser():
     """
-        Parse the arguments and apply bits of the configuration given
+        The parser of the command line arguments
     """
-    global settings
-    global logger
-
     parser = argparse.ArgumentParser()
 
     output_control = parser.add_mutually_exclusive_group()
@@ -40,7 +56,21 @@ def arg_parse():
                         help="Should Léodagan ignore an unreadable or missing file")
     parser.add_argument('--extra-information', action='store_true', default=False,
                         help="Add extra information to provide better help")
-    settings = parser.parse_args()
+    parser.add_argument('--batch', action='store_true', default=False,
+                        help="Check every news in the given directories and archives " + \
+                             "in parallel, and print statistics per author")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Processes used by --batch, the number of cores by default")
+    return parser
+
+def arg_parse(args: list = None) -> Config:
+    """
+        Parse the arguments, configure the loggers of the command line accordingly,
+        and return the configuration given
+    """
+    parsed = vars(make_parser().parse_args(args))
+    parsed["files"] = tuple(parsed["files"])
+    settings = Config(**parsed)
 
     console_handler = logging.StreamHandler()
     output_handler = logging.StreamHandler()
@@ -65,3 +95,5 @@ def arg_parse():
     output_handler.setFormatter(lf)
     output.addHandler(output_handler)
     output.setLevel(verbosity_threshold_output)
+
+    return settings
@@ -5,12 +5,14 @@ import sys
 import leodagan.settings as ls
 import leodagan.engine as lengine
 
-def read_input():
+def read_input(config: ls.Config = ls.DEFAULT_CONFIG):
     ls.logger.debug("Reading from stdin")
     input_msg = sys.stdin.read()
     ls.logger.debug(f"Read {len(input_msg)} chars from stdin")
 
-    is_content_compliant = lengine.process_news(input_msg, identification="stdin")
+    report = lengine.process_news(input_msg, config, identification="stdin")
+    lengine.write_report(report, config)
+    is_content_compliant = report.compliant
 
     if not is_content_compliant:
         ls.logger.error(f"Input does not respect the nétiquette !")
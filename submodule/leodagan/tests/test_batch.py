@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Tests of the batch mode, run with `python -m unittest discover tests`
+"""
+
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS))
+
+# pylint: disable=wrong-import-position
+import leodagan.batch as lbatch
+import leodagan.settings as ls
+
+NEWS = ["valid/1"] + [f"non-valid/{i}" for i in range(1, 6)]
+
+class TestBatch(unittest.TestCase):
+    """
+        Run the batch mode on a directory of news spanning several chunks
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.directory = os.path.join(cls.tmp, "news")
+        os.mkdir(cls.directory)
+        for i in range(3 * lbatch.CHUNK_SIZE):
+            shutil.copy(os.path.join(TESTS, NEWS[i % len(NEWS)]),
+                        os.path.join(cls.directory, f"{i:03}"))
+        cls.archive = os.path.join(cls.tmp, "news.tar.gz")
+        with tarfile.open(cls.archive, "w:gz") as archive:
+            archive.add(cls.directory, arcname="news")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def run_batch(self, path: str, jobs: int):
+        """
+            The result, the log records and the standard output of a batch run
+        """
+        stdout = StringIO()
+        with self.assertLogs(level="INFO") as logs:
+            with redirect_stdout(stdout):
+                compliant = lbatch.run_batch([path], ls.Config(batch=True, jobs=jobs))
+        return compliant, logs.output, stdout.getvalue()
+
+    def test_jobs_give_same_output(self):
+        compliant, logs, stdout = self.run_batch(self.directory, 1)
+
+        self.assertFalse(compliant)
+        self.assertEqual(3 * lbatch.CHUNK_SIZE, sum("nétiquette" in line for line in logs))
+        self.assertEqual((compliant, logs, stdout), self.run_batch(self.directory, 2))
+
+    def test_archive(self):
+        compliant, logs, stdout = self.run_batch(self.directory, 1)
+        logs = [line.replace(f"{self.directory}/", f"{self.archive}:news/")
+                for line in logs]
+
+        self.assertEqual((compliant, logs, stdout), self.run_batch(self.archive, 2))
+
+if __name__ == "__main__":
+    unittest.main()
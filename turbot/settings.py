@@ -13,9 +13,10 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 import os
 from pathlib import Path
 import environ
-from slack import WebClient
 from dateutil import parser
 
+from turbot.slack_client import ThreadLocalWebClient
+
 env = environ.Env(DEBUG=(bool, False))
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -136,7 +137,35 @@ LOGGING = {
 
 ERROR_ICON_URL = env("ERROR_ICON_URL", default=None)
 
-SLACK_CLIENT = WebClient(SLACK_API_TOKEN)
+SLACK_CLIENT = ThreadLocalWebClient(SLACK_API_TOKEN)
+
+# Acknowledge Slack right away and run the handlers on a background thread pool
+SLACK_ASYNC_DISPATCH = env.bool("SLACK_ASYNC_DISPATCH", default=False)
+SLACK_DISPATCH_WORKERS = env.int("SLACK_DISPATCH_WORKERS", default=4)
+SLACK_DISPATCH_QUEUE_SIZE = env.int("SLACK_DISPATCH_QUEUE_SIZE", default=64)
+SLACK_DISPATCH_DRAIN_TIMEOUT = env.int("SLACK_DISPATCH_DRAIN_TIMEOUT", default=25)
+
+# How long (in seconds) a delivery is remembered to drop Slack retries
+SLACK_DEDUP_TTL = env.int("SLACK_DEDUP_TTL", default=3600)
+
+# In-process cache of the Team, Channel and User rows (TTL in seconds)
+IDENTITY_CACHE_SIZE = env.int("IDENTITY_CACHE_SIZE", default=4096)
+IDENTITY_CACHE_TTL = env.int("IDENTITY_CACHE_TTL", default=300)
+
+# Poll messages are updated at most once per delay (in seconds)
+POLL_UPDATE_DELAY = env.float("POLL_UPDATE_DELAY", default=1.0)
+POLL_UPDATE_LEASE = env.int("POLL_UPDATE_LEASE", default=30)
+
+# Voters shown in poll messages, the others are listed in a modal
+POLL_VOTERS_SHOWN = env.int("POLL_VOTERS_SHOWN", default=20)
+POLL_VOTERS_PAGE_SIZE = env.int("POLL_VOTERS_PAGE_SIZE", default=100)
+
+# In-process cache of the rendered choice blocks of the latest polls
+POLL_RENDER_CACHE_SIZE = env.int("POLL_RENDER_CACHE_SIZE", default=512)
+POLL_RENDER_CACHE_TTL = env.int("POLL_RENDER_CACHE_TTL", default=3600)
+
+# Checkout of the Léodagan nétiquette checker, imported by the spell check
+LEODAGAN_PATH = env("LEODAGAN_PATH", default=str(BASE_DIR / "submodule" / "leodagan"))
 
 NIGHT_START = parser.parse(env("NIGHT_START", default="23:00")).time()
 NIGHT_END = parser.parse(env("NIGHT_END", default="09:00")).time()
@@ -0,0 +1,26 @@
+import threading
+
+from slack import WebClient
+
+
+class ThreadLocalWebClient:
+    """
+    Proxy giving each thread its own WebClient.
+    A WebClient keeps the event loop of the first thread that used it, so a single
+    instance cannot be shared by the background dispatcher threads.
+    """
+
+    def __init__(self, token: str):
+        self.token = token
+        self._local = threading.local()
+
+    @property
+    def client(self) -> WebClient:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = WebClient(self.token)
+            self._local.client = client
+        return client
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
@@ -8,6 +8,8 @@ from slackblocks import (
     ActionsBlock,
     Button,
     ContextBlock,
+    BlockTemplate,
+    hole,
 )
 from turbot import settings
 from workspaces.utils import (
@@ -21,21 +23,31 @@ from workspaces.utils import (
 logger = logging.getLogger("slackbot")
 
 
-def get_photo_blocks(photo_slug, url, stalker=None):
-    blocks = [
-        SectionBlock(text=f"*{photo_slug}*"),
-        ImageBlock(image_url=url, alt_text=photo_slug, title=photo_slug),
+PHOTO_BLOCKS = [
+    SectionBlock(text=f"*{hole('slug')}*"),
+    ImageBlock(image_url=hole("url"), alt_text=hole("slug"), title=hole("slug")),
+]
+
+PHOTO_TEMPLATE = BlockTemplate(
+    [
+        *PHOTO_BLOCKS,
+        ActionsBlock(
+            Button(text="Send to Channel", action_id="photo.post", value=hole("slug"))
+        ),
     ]
+)
+
+POSTED_PHOTO_TEMPLATE = BlockTemplate(
+    [*PHOTO_BLOCKS, ContextBlock(f"*Stalké Par: {hole('stalker')}*")]
+)
+
+
+def get_photo_blocks(photo_slug, url, stalker=None):
     if not stalker:
-        blocks.append(
-            ActionsBlock(
-                Button(text="Send to Channel", action_id="photo.post", value=photo_slug)
-            )
-        )
-    else:
-        blocks.append(ContextBlock(f"*Stalké Par: {stalker.slack_username}*"))
-
-    return repr(blocks)
+        return PHOTO_TEMPLATE.render(slug=photo_slug, url=url)
+    return POSTED_PHOTO_TEMPLATE.render(
+        slug=photo_slug, url=url, stalker=stalker.slack_username
+    )
 
 
 @register_slack_command("/cri-photo")
@@ -21,7 +21,8 @@ logger = logging.getLogger("slackbot")
 
 
 def get_report_blocks(login, text, author=None):
-    blocks = [
+    # Not serialized, so that send_message splits a description of maximal length
+    return [
         SectionBlock(
             f"Report `{login}`:\n{text}",
             accessory=Image(
@@ -30,7 +31,6 @@ def get_report_blocks(login, text, author=None):
         ),
         ContextBlock(f"*By: {author.slack_username}*"),
     ]
-    return repr(blocks)
 
 
 @register_slack_command("/report")
@@ -42,14 +42,12 @@ def report(state):
     blocks = [
         InputBlock(
             "Choose a student",
-            element=TextInput(
-                "report.student", initial_value=login
-            ),
-            #element=ExternalSelect(
+            element=TextInput("report.student", initial_value=login),
+            # element=ExternalSelect(
             #    "Type a login",
             #    "report.student",
             #    initial_option=Option(login, login) if login else None,
-            #),
+            # ),
         ),
         InputBlock(
             "Describe the issue",
@@ -71,7 +69,7 @@ def report(state):
 def post_report(state):
     if state.type == "view_submission":
         modal_state = get_modal_state(state.payload)
-        #login = modal_state["report.student"]["selected_option"]["value"]
+        # login = modal_state["report.student"]["selected_option"]["value"]
         login = modal_state["report.student"]["value"]
         description = modal_state["report.description"]["value"]
         blocks = get_report_blocks(login, description, state.user)
@@ -1,20 +1,28 @@
 import logging
-from subprocess import check_output, STDOUT
+import sys
 
 from slackblocks import Text, SectionBlock
 from turbot import settings
 from workspaces.utils import register_slack_event, send_message, register_slack_action
 
+if settings.LEODAGAN_PATH not in sys.path:
+    sys.path.append(settings.LEODAGAN_PATH)
+
+import leodagan.engine as lengine  # noqa: E402
+
 logger = logging.getLogger("slackbot")
 
 
-def launch_leodagan(input_str):
-    result = check_output(
-        ["python", "submodule/leodagan/leodagan.py", "-q"],
-        stderr=STDOUT,
-        input=input_str.encode(),
-    )
-    return result
+def launch_leodagan(input_str: str) -> str:
+    """
+    The nétiquette violations of a message, one per line.
+    """
+    try:
+        violations = lengine.check(input_str)
+    except Exception as e:
+        logger.warning(f"Léodagan cannot parse the message: {e}")
+        return f"Cannot parse the message: {e}"
+    return "\n".join(str(violation) for violation in violations)
 
 
 def find_code_blocks(message):
@@ -36,20 +44,20 @@ def process_leodagan(state, message):
 
     blocks = []
     for text in texts_to_test:
-        leodagan_result = launch_leodagan(text).decode("utf-8")
+        leodagan_result = launch_leodagan(text)
         if not leodagan_result:
             leodagan_result = "La netiquette est conforme."
         blocks.append(SectionBlock(Text(f"```{leodagan_result}```")))
 
     if blocks:
-        send_message(state, text="Léodagan report", blocks=repr(blocks))
+        send_message(state, text="Léodagan report", blocks=blocks)
 
 
 @register_slack_action("leodagan.check")
 def spell_check_shortcut(state):
     if state.thread_ts:
         query = settings.SLACK_CLIENT.conversations_replies(
-            channel=state.channel.id,
+            channel=state.channel_id,
             ts=state.ts,
             latest=state.thread_ts,
             limit=1,
@@ -58,7 +66,7 @@ def spell_check_shortcut(state):
     else:
         state.thread_ts = state.ts
         query = settings.SLACK_CLIENT.conversations_history(
-            channel=state.channel.id, latest=state.ts, limit=1, inclusive="true",
+            channel=state.channel_id, latest=state.ts, limit=1, inclusive="true",
         )
     message = query["messages"][0]
     process_leodagan(state, message)
@@ -68,7 +76,7 @@ def spell_check_shortcut(state):
 def spell_check(state):
     if state.thread_ts:  # Mentioned in a thread
         query = settings.SLACK_CLIENT.conversations_history(
-            channel=state.channel.id, latest=state.thread_ts, limit=1, inclusive="true",
+            channel=state.channel_id, latest=state.thread_ts, limit=1, inclusive="true",
         )
         message = query["messages"][0]
         process_leodagan(state, message)
@@ -0,0 +1,75 @@
+import json
+import logging
+import time
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpRequest
+from django.utils import timezone
+
+from workspaces.models import SlackDelivery
+
+logger = logging.getLogger("slackbot")
+
+_last_purge = 0.0
+
+
+def event_delivery_key(request: HttpRequest) -> Optional[str]:
+    event_id = json.loads(request.body).get("event_id")
+    return f"event:{event_id}" if event_id else None
+
+
+def action_delivery_key(request: HttpRequest) -> Optional[str]:
+    payload = json.loads(request.POST["payload"])
+    trigger_id = payload.get("trigger_id")
+    if not trigger_id and payload.get("actions"):
+        trigger_id = payload["actions"][0].get("action_ts")
+    return f"action:{trigger_id}" if trigger_id else None
+
+
+def command_delivery_key(request: HttpRequest) -> Optional[str]:
+    trigger_id = request.POST.get("trigger_id")
+    return f"command:{trigger_id}" if trigger_id else None
+
+
+def purge_deliveries():
+    """
+    Forget the deliveries older than SLACK_DEDUP_TTL, at most once per TTL and process.
+    """
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < settings.SLACK_DEDUP_TTL:
+        return
+    _last_purge = now
+    SlackDelivery.objects.filter(
+        created_at__lt=timezone.now() - timedelta(seconds=settings.SLACK_DEDUP_TTL)
+    ).delete()
+
+
+def is_duplicate_delivery(request: HttpRequest, key: Optional[str]) -> bool:
+    """
+    Claim `key` for this delivery.
+    Returns True if another delivery (usually a Slack retry) already claimed it.
+    """
+    if not key:
+        return False
+    purge_deliveries()
+    try:
+        with transaction.atomic():
+            SlackDelivery.objects.create(key=key)
+    except IntegrityError:
+        logger.info(
+            f"Dropping duplicate delivery {key} (retry {request.headers.get('X-Slack-Retry-Num')})"
+        )
+        return True
+    return False
+
+
+def release_delivery(key: Optional[str]):
+    """
+    Forget a delivery that failed, so that the Slack retry is processed.
+    """
+    if key:
+        SlackDelivery.objects.filter(key=key).delete()
@@ -0,0 +1,139 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+logger = logging.getLogger("slackbot")
+
+_STOP = object()
+
+
+def run_handlers(
+    handlers: List[Callable], state, on_error: Optional[Callable] = None
+) -> bool:
+    """
+    Run every handler on `state`, reporting each failure on its own so that one
+    broken handler does not prevent the next ones from running.
+    Returns True if all the handlers succeeded.
+    """
+    success = True
+    for handler in handlers:
+        try:
+            handler(state)
+        except Exception as e:
+            success = False
+            logger.exception(f"Handler {handler} failed on {state.command}: {e}")
+            if on_error:
+                try:
+                    on_error(state, e)
+                except Exception:
+                    logger.exception(f"Error reporting failed for {state.command}")
+    return success
+
+
+class Dispatcher:
+    """
+    Bounded pool of worker threads running Slack handlers after the webhook has
+    been acknowledged.
+    Threads are started on the first submission, so the pool is never forked by
+    a preloading gunicorn master.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int):
+        self.max_workers = max_workers
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.threads = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def _start(self):
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.max_workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"slack-dispatch-{i}", daemon=True
+                )
+                thread.start()
+                self.threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is _STOP:
+                    return
+                close_old_connections()
+                run_handlers(*job)
+            finally:
+                close_old_connections()
+                self.queue.task_done()
+                if job is _STOP:
+                    connections.close_all()
+
+    def submit(
+        self, handlers: List[Callable], state, on_error: Optional[Callable] = None
+    ) -> bool:
+        """
+        Queue the handlers for `state`.
+        Returns False if the dispatcher is closed or its queue is full, in which
+        case the caller is expected to run the handlers itself.
+        """
+        if self.closed:
+            return False
+        if not self.threads:
+            self._start()
+        try:
+            self.queue.put_nowait((handlers, state, on_error))
+        except queue.Full:
+            logger.warning(
+                f"Dispatch queue full ({self.queue.maxsize}), running {state.command} inline"
+            )
+            return False
+        return True
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """
+        Stop accepting jobs, and wait for the queued ones to be processed.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            threads = list(self.threads)
+        if not threads:
+            return
+        logger.info(f"Draining {self.queue.qsize()} Slack jobs")
+        for _ in threads:
+            self.queue.put(_STOP)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for thread in threads:
+            thread.join(max(0, deadline - time.monotonic()) if deadline else None)
+            if thread.is_alive():
+                logger.error(f"{thread.name} did not finish draining in time")
+                break
+
+
+dispatcher = Dispatcher(
+    max_workers=settings.SLACK_DISPATCH_WORKERS,
+    max_queue_size=settings.SLACK_DISPATCH_QUEUE_SIZE,
+)
+
+atexit.register(dispatcher.shutdown, settings.SLACK_DISPATCH_DRAIN_TIMEOUT)
+
+
+def dispatch(
+    handlers: List[Callable], state, on_error: Optional[Callable] = None
+) -> bool:
+    """
+    Hand the handlers to the background dispatcher if it is enabled.
+    Returns False if the handlers have to be run inline.
+    """
+    if not settings.SLACK_ASYNC_DISPATCH:
+        return False
+    return dispatcher.submit(handlers, state, on_error)
@@ -0,0 +1,169 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+from workspaces.models import Team, Channel, User
+
+
+class IdentityMap:
+    """
+    LRU cache of model instances by primary key, whose entries expire after `ttl`
+    seconds so that rows edited by another process are eventually reloaded.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, instance):
+        with self.lock:
+            self.entries[key] = (instance, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+
+IDENTITY_MAPS = {
+    model: IdentityMap(settings.IDENTITY_CACHE_SIZE, settings.IDENTITY_CACHE_TTL)
+    for model in (Team, Channel, User)
+}
+
+NAME_FIELDS = {Team: "domain", Channel: "name", User: "name"}
+
+
+def _copy(instance):
+    """
+    A copy of `instance` which does not share its state (nor its cache of related
+    instances) with it, so that the cached instances are never mutated.
+    """
+    instance = copy.copy(instance)
+    instance._state = copy.copy(instance._state)
+    instance._state.fields_cache = {}
+    return instance
+
+
+def _remember(identity_map: IdentityMap, pk: str, instance):
+    """
+    Store a copy of `instance` in the identity map, once the current transaction
+    (which may have inserted or renamed it) is committed.
+    """
+    instance = _copy(instance)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: identity_map.set(pk, instance))
+    else:
+        identity_map.set(pk, instance)
+
+
+def _resolve(
+    model,
+    pk: str,
+    name: Optional[str],
+    create: bool,
+    before_insert: Optional[Callable] = None,
+    **fields,
+):
+    """
+    Return the `model` instance `pk`, from the identity map if possible.
+    A miss is loaded with one query, and inserted if missing (when `create` is set,
+    after calling `before_insert`).
+    The name field is updated if Slack reports a different one.
+    """
+    identity_map = IDENTITY_MAPS[model]
+    name_field = NAME_FIELDS[model]
+
+    instance = identity_map.get(pk)
+    if instance is not None:
+        instance = _copy(instance)
+    else:
+        instance = model.objects.filter(pk=pk).first()
+        if instance is None:
+            if not create:
+                raise model.DoesNotExist(f"{model.__name__} {pk} does not exist")
+            if before_insert:
+                before_insert()
+            instance = model(pk=pk, **fields, **{name_field: name})
+            model.objects.bulk_create([instance], ignore_conflicts=True)
+        _remember(identity_map, pk, instance)
+
+    if name is not None and getattr(instance, name_field) != name:
+        model.objects.filter(pk=pk).update(**{name_field: name})
+        setattr(instance, name_field, name)
+        _remember(identity_map, pk, instance)
+
+    return instance
+
+
+def get_team(team_id: str, domain: Optional[str] = None, create=True) -> Team:
+    return _resolve(Team, team_id, domain, create)
+
+
+def get_channel(
+    channel_id: str,
+    team_id: str,
+    name: Optional[str] = None,
+    create=True,
+    before_insert: Optional[Callable] = None,
+) -> Channel:
+    return _resolve(Channel, channel_id, name, create, before_insert, team_id=team_id)
+
+
+def get_user(
+    user_id: str,
+    team_id: str,
+    name: Optional[str] = None,
+    create=True,
+    before_insert: Optional[Callable] = None,
+) -> User:
+    return _resolve(User, user_id, name, create, before_insert, team_id=team_id)
+
+
+def identity_stats() -> Dict[str, Dict[str, int]]:
+    return {model.__name__: m.stats for model, m in IDENTITY_MAPS.items()}
+
+
+def clear_identity_maps():
+    for identity_map in IDENTITY_MAPS.values():
+        identity_map.clear()
+
+
+def _invalidate(sender, instance, **kwargs):
+    IDENTITY_MAPS[sender].invalidate(instance.pk)
+
+
+for _model in IDENTITY_MAPS:
+    post_save.connect(_invalidate, sender=_model)
+    post_delete.connect(_invalidate, sender=_model)
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.5 on 2026-10-18 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workspaces", "0003_user_has_permissions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlackDelivery",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
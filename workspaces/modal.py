@@ -4,7 +4,7 @@ from typing import List, Optional
 
 from django.conf import settings
 
-from slackblocks import SectionBlock, Union, Text, Block
+from slackblocks import SectionBlock, Union, Text, Block, serialize_blocks
 from workspaces.utils import SLACK_ACTIONS, SlackState
 
 logger = logging.getLogger("slackbot")
@@ -13,7 +13,7 @@ logger = logging.getLogger("slackbot")
 def make_modal(
     state: SlackState,
     title: Union[str, Text],
-    blocks: List[Block],
+    blocks: Union[List[Block], str],
     action_id: Optional[str] = None,
     value: Optional[str] = None,
     metadata: Optional[dict] = {},
@@ -22,7 +22,7 @@ def make_modal(
 ):
     private_metadata = {
         **get_modal_metadata(state),
-        "channel_id": state.channel.id,
+        "channel_id": state.channel_id,
         "action_id": action_id,
         "value": value,
         "ts": state.ts,
@@ -35,7 +35,7 @@ def make_modal(
         "title": Text.to_text(title, force_plaintext=True)._resolve(),
         "submit": Text.to_text(submit, force_plaintext=True)._resolve(),
         "close": Text.to_text(close, force_plaintext=True)._resolve(),
-        "blocks": repr(blocks),
+        "blocks": blocks if isinstance(blocks, str) else serialize_blocks(blocks),
         "private_metadata": json.dumps(private_metadata),
     }
 
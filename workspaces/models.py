@@ -28,7 +28,23 @@ class User(models.Model):
 
     @property
     def slack_username(self):
-        return f"<@{self.id}>{self.suffix}"
+        return self.format_slack_username(self.id, self.suffix)
+
+    @staticmethod
+    def format_slack_username(user_id: str, suffix: str) -> str:
+        return f"<@{user_id}>{suffix}"
 
     def __str__(self):
         return f"{self.name} {self.slack_username}"
+
+
+class SlackDelivery(models.Model):
+    """
+    A webhook delivery already handled, used to drop Slack retries.
+    """
+
+    key = models.CharField(primary_key=True, max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.key
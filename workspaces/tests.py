@@ -0,0 +1,332 @@
+import json
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+
+from slackblocks import (
+    MAX_SECTION_TEXT,
+    BlockTemplate,
+    Button,
+    DividerBlock,
+    SectionBlock,
+    hole,
+    join_blocks,
+    serialize_blocks,
+    split_text,
+)
+from slackblocks.errors import InvalidUsageError
+
+from .dedup import (
+    action_delivery_key,
+    event_delivery_key,
+    is_duplicate_delivery,
+    release_delivery,
+)
+from .dispatch import Dispatcher, run_handlers
+from .identity import (
+    clear_identity_maps,
+    get_channel,
+    get_team,
+    get_user,
+    identity_stats,
+)
+from .actions.report import get_report_blocks
+from .actions.spell_check import launch_leodagan
+from . import views
+from .models import Team, User
+from .utils import SLACK_EVENTS, SlackState, send_message
+
+
+class TestDispatcher(SimpleTestCase):
+    def test_run_handlers_reports_each_failure(self):
+        calls = []
+        errors = []
+
+        def failing(state):
+            calls.append("failing")
+            raise ValueError("boom")
+
+        def working(state):
+            calls.append("working")
+
+        state = SimpleNamespace(command="/test")
+        success = run_handlers(
+            [failing, working], state, lambda s, e: errors.append(str(e))
+        )
+
+        self.assertFalse(success)
+        self.assertEqual(["failing", "working"], calls)
+        self.assertEqual(["boom"], errors)
+
+    def test_shutdown_drains_queue(self):
+        done = []
+        dispatcher = Dispatcher(max_workers=2, max_queue_size=10)
+        state = SimpleNamespace(command="/test")
+
+        for i in range(5):
+            self.assertTrue(dispatcher.submit([lambda s, i=i: done.append(i)], state))
+        dispatcher.shutdown(timeout=5)
+
+        self.assertEqual([0, 1, 2, 3, 4], sorted(done))
+        self.assertFalse(dispatcher.submit([lambda s: None], state))
+
+    def test_full_queue_is_refused(self):
+        release = threading.Event()
+        dispatcher = Dispatcher(max_workers=1, max_queue_size=1)
+        state = SimpleNamespace(command="/test")
+
+        started = threading.Event()
+
+        def block(s):
+            started.set()
+            release.wait(5)
+
+        self.assertTrue(dispatcher.submit([block], state))
+        started.wait(5)
+        self.assertTrue(dispatcher.submit([lambda s: None], state))
+        self.assertFalse(dispatcher.submit([lambda s: None], state))
+
+        release.set()
+        dispatcher.shutdown(timeout=5)
+
+
+class TestDeliveryDedup(TestCase):
+    def test_retry_is_duplicate(self):
+        body = json.dumps({"event_id": "Ev01", "event": {}})
+        request = RequestFactory().post("/event", body, content_type="application/json")
+        key = event_delivery_key(request)
+
+        self.assertFalse(is_duplicate_delivery(request, key))
+        self.assertTrue(is_duplicate_delivery(request, key))
+
+        release_delivery(key)
+        self.assertFalse(is_duplicate_delivery(request, key))
+
+    def test_retry_after_failure_is_handled(self):
+        body = json.dumps(
+            {
+                "type": "event_callback",
+                "event_id": "Ev02",
+                "event": {
+                    "type": "test_failure",
+                    "team": "T1",
+                    "user": "U1",
+                    "channel": "C1",
+                    "text": "",
+                },
+            }
+        )
+        handler = Mock(side_effect=[OperationalError("database is locked"), None])
+
+        with patch.dict(SLACK_EVENTS, {"test_failure": [handler]}):
+            request = RequestFactory().post(
+                "/event", body, content_type="application/json"
+            )
+            with self.assertRaises(OperationalError):
+                views.event(request)
+
+            retry = RequestFactory().post(
+                "/event",
+                body,
+                content_type="application/json",
+                HTTP_X_SLACK_RETRY_NUM="1",
+            )
+            self.assertEqual(200, views.event(retry).status_code)
+
+        self.assertEqual(2, handler.call_count)
+
+    def test_action_without_key(self):
+        request = RequestFactory().post("/action", {"payload": json.dumps({})})
+        key = action_delivery_key(request)
+
+        self.assertIsNone(key)
+        self.assertFalse(is_duplicate_delivery(request, key))
+        self.assertFalse(is_duplicate_delivery(request, key))
+
+
+class TestIdentityMap(TransactionTestCase):
+    def setUp(self):
+        clear_identity_maps()
+
+    def test_second_lookup_is_cached(self):
+        # A select, and an insert in its own transaction, by model
+        with self.assertNumQueries(9):
+            get_team("T1", "team")
+            get_channel("C1", "T1", "general")
+            get_user("U1", "T1", "user")
+
+        with self.assertNumQueries(0):
+            get_team("T1", "team")
+            get_channel("C1", "T1", "general")
+            get_user("U1", "T1", "user")
+
+        self.assertEqual({"hits": 1, "misses": 1, "size": 1}, identity_stats()["User"])
+
+    def test_name_is_refreshed(self):
+        get_team("T1", "team")
+        get_user("U1", "T1", "old")
+
+        with self.assertNumQueries(1):
+            user = get_user("U1", "T1", "new")
+
+        self.assertEqual("new", user.name)
+        self.assertEqual("new", User.objects.get(id="U1").name)
+
+    def test_rolled_back_insert_is_not_cached(self):
+        with self.assertRaises(OperationalError):
+            with transaction.atomic():
+                get_team("T1", "team")
+                raise OperationalError("rollback")
+
+        self.assertEqual(0, identity_stats()["Team"]["size"])
+        with self.assertNumQueries(3):
+            get_team("T1", "team")
+        self.assertTrue(Team.objects.filter(id="T1").exists())
+
+    def test_cached_instance_is_not_shared(self):
+        team = get_team("T1", "team")
+        team.domain = "changed"
+
+        self.assertIsNot(team, get_team("T1"))
+        self.assertEqual("team", get_team("T1").domain)
+
+    def test_missing_without_create(self):
+        get_team("T1", "team")
+        with self.assertRaises(User.DoesNotExist):
+            get_user("U1", "T1", create=False)
+
+
+class TestLazySlackState(TestCase):
+    def setUp(self):
+        clear_identity_maps()
+
+    def test_models_resolved_on_access(self):
+        request = RequestFactory().post(
+            "/command",
+            {
+                "team_id": "T1",
+                "team_domain": "team",
+                "channel_id": "C1",
+                "channel_name": "general",
+                "user_id": "U1",
+                "user_name": "user",
+                "command": "/test",
+                "text": "",
+                "trigger_id": "1.2",
+            },
+        )
+
+        with self.assertNumQueries(0):
+            state = SlackState.from_command_request(request)
+            self.assertEqual("C1", state.channel_id)
+
+        # The team is created before the user referencing it
+        with self.assertNumQueries(4):
+            self.assertEqual("user", state.user.name)
+        self.assertEqual("T1", state.user.team_id)
+
+
+class TestBlockTemplates(SimpleTestCase):
+    def make_blocks(self, name, value):
+        return SectionBlock(
+            f"*{name}*", block_id="name", accessory=Button("Vote", "vote", value=value)
+        )
+
+    def test_render_matches_blocks(self):
+        template = BlockTemplate(self.make_blocks(hole("name"), hole("value")))
+        name = 'Quotes " and \\ and\nnewlines'
+
+        self.assertEqual(
+            serialize_blocks(self.make_blocks(name, "42")),
+            template.render(name=name, value=42),
+        )
+        self.assertEqual(
+            json.loads(join_blocks(template.fill(name="a", value=1), "")),
+            json.loads(serialize_blocks(self.make_blocks("a", "1"))),
+        )
+
+    def test_missing_value(self):
+        template = BlockTemplate(self.make_blocks(hole("name"), hole("value")))
+        with self.assertRaises(InvalidUsageError):
+            template.render(name="a")
+
+
+class TestMessagePagination(SimpleTestCase):
+    def test_split_code_block(self):
+        code = "```" + "\n".join(f"    line {i}" for i in range(1000)) + "```"
+        chunks = split_text(code)
+
+        self.assertTrue(all(len(chunk) <= MAX_SECTION_TEXT for chunk in chunks))
+        self.assertTrue(all(c.startswith("```    line") for c in chunks))
+        self.assertTrue(all(c.endswith("```") for c in chunks))
+        self.assertEqual(code, "```" + "\n".join(c[3:-3] for c in chunks) + "```")
+
+    def test_long_section_is_split(self):
+        blocks = json.loads(serialize_blocks(SectionBlock("word " * 1000)))
+
+        self.assertEqual(2, len(blocks))
+        self.assertEqual(f"{blocks[0]['block_id']}.1", blocks[1]["block_id"])
+
+    def test_long_message_is_threaded(self):
+        client = Mock()
+        client.chat_postMessage.return_value = {"ts": "1.1"}
+        state = SimpleNamespace(channel_id="C1", thread_ts=None)
+        with override_settings(SLACK_CLIENT=client):
+            send_message(state, "Long", [DividerBlock() for _ in range(120)])
+
+        calls = client.chat_postMessage.call_args_list
+        self.assertEqual([None, "1.1", "1.1"], [c[1]["thread_ts"] for c in calls])
+        self.assertEqual([50, 50, 20], [len(json.loads(c[1]["blocks"])) for c in calls])
+
+    def test_long_report_is_split(self):
+        description = "word " * (MAX_SECTION_TEXT // 5)
+        author = SimpleNamespace(slack_username="author")
+        client = Mock()
+        client.chat_postMessage.return_value = {"ts": "1.1"}
+        state = SimpleNamespace(channel_id="C1", thread_ts=None)
+        with override_settings(SLACK_CLIENT=client):
+            send_message(
+                state, "Report", get_report_blocks("login", description, author)
+            )
+
+        blocks = json.loads(client.chat_postMessage.call_args[1]["blocks"])
+        texts = [
+            block["text"]["text"] for block in blocks if block["type"] == "section"
+        ]
+        self.assertEqual(2, len(texts))
+        self.assertTrue(all(len(text) <= MAX_SECTION_TEXT for text in texts))
+        self.assertEqual(f"Report `login`:\n{description}", "\n".join(texts))
+
+
+class TestLeodagan(SimpleTestCase):
+    def read_news(self, name):
+        return (Path(settings.LEODAGAN_PATH) / "tests" / name).read_text()
+
+    def test_compliant_news(self):
+        self.assertEqual("", launch_leodagan(self.read_news("valid/1")))
+
+    def test_violations_are_listed(self):
+        self.assertEqual(
+            "Invalid subject: Length exceed 80 chars / see 2.1.1.2\n"
+            "Invalid subject: Subject must have tags and a summary / see 2.1.1",
+            launch_leodagan(self.read_news("non-valid/2")),
+        )
+
+    def test_all_violations_are_listed(self):
+        report = launch_leodagan(self.read_news("non-valid/5")).split("\n")
+
+        self.assertEqual(5, len(report))
+        self.assertIn("Line 0 has a trailing whitespace", report[0])
+        self.assertIn("Line 4 has a trailing whitespace", report[1])
+        self.assertIn("(line 4)", report[4])
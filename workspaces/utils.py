@@ -1,12 +1,14 @@
 import json
 import logging
 from dataclasses import dataclass
-from functools import partial
+from functools import cached_property, partial
 from typing import Optional
 
 from django.conf import settings
 from django.http import JsonResponse, HttpRequest
 
+from slackblocks import serialize_pages
+from workspaces.identity import get_team, get_channel, get_user
 from workspaces.models import Team, Channel, User
 
 SLACK_ACTIONS = {}
@@ -64,23 +66,39 @@ def send_ephemeral(state, text, blocks=None, thread_ts=None):
     logger.debug(
         settings.SLACK_CLIENT.chat_postEphemeral(
             text=text,
-            channel=state.channel.id,
+            channel=state.channel_id,
             blocks=blocks,
-            user=state.user.id,
+            user=state.user_id,
             thread_ts=thread_ts if thread_ts else state.thread_ts,
         )
     )
 
 
 def send_message(state, text, blocks=None, thread_ts=None):
-    logger.debug(
-        settings.SLACK_CLIENT.chat_postMessage(
-            text=text,
-            channel=state.channel.id,
-            blocks=blocks,
-            thread_ts=thread_ts if thread_ts else state.thread_ts,
-        )
+    """
+    Post a message, and return the response of Slack.
+    Blocks can be given serialized, or as a list of blocks, in which case they are
+    split into a message and its replies if they exceed the limits of Slack.
+    """
+    pages = [blocks]
+    if blocks is not None and not isinstance(blocks, str):
+        pages = serialize_pages(blocks)
+    thread_ts = thread_ts if thread_ts else state.thread_ts
+
+    response = settings.SLACK_CLIENT.chat_postMessage(
+        text=text, channel=state.channel_id, blocks=pages[0], thread_ts=thread_ts
     )
+    logger.debug(response)
+    for page in pages[1:]:
+        logger.debug(
+            settings.SLACK_CLIENT.chat_postMessage(
+                text=text,
+                channel=state.channel_id,
+                blocks=page,
+                thread_ts=thread_ts if thread_ts else response["ts"],
+            )
+        )
+    return response
 
 
 def int_to_emoji(index: int):
@@ -102,9 +120,15 @@ def int_to_emoji(index: int):
 
 @dataclass
 class SlackState:
-    team: Team
-    user: User
-    channel: Channel
+    """
+    The `team`, `user` and `channel` models are only resolved (and created if
+    `create_models` is set) the first time they are accessed, the raw ids are
+    always available.
+    """
+
+    team_id: str
+    user_id: str
+    channel_id: str
     type: str
     command: str  # if block_actions, `action_id`
     text: str  # if block_actions, `value`
@@ -113,34 +137,50 @@ class SlackState:
     thread_ts: Optional[str] = None
     trigger_id: Optional[str] = None
     response_url: Optional[str] = None
-
-    @classmethod
-    def from_command_request(cls, request: HttpRequest) -> "SlackState":
-        team, _ = Team.objects.get_or_create(
-            id=request.POST["team_id"], defaults={"domain": request.POST["team_domain"]}
-        )
-
-        channel, _ = Channel.objects.get_or_create(
-            id=request.POST["channel_id"],
-            team=team,
-            defaults={"name": request.POST["channel_name"]},
+    team_domain: Optional[str] = None
+    user_name: Optional[str] = None
+    channel_name: Optional[str] = None
+    create_models: bool = True
+
+    @cached_property
+    def team(self) -> Team:
+        return get_team(self.team_id, self.team_domain, create=self.create_models)
+
+    @cached_property
+    def channel(self) -> Channel:
+        return get_channel(
+            self.channel_id,
+            self.team_id,
+            self.channel_name,
+            create=self.create_models,
+            before_insert=lambda: self.team,
         )
 
-        user, _ = User.objects.get_or_create(
-            id=request.POST["user_id"],
-            team=team,
-            defaults={"name": request.POST["user_name"]},
+    @cached_property
+    def user(self) -> User:
+        return get_user(
+            self.user_id,
+            self.team_id,
+            self.user_name,
+            create=self.create_models,
+            before_insert=lambda: self.team,
         )
 
+    @classmethod
+    def from_command_request(cls, request: HttpRequest) -> "SlackState":
         return cls(
-            team,
-            user,
-            channel,
+            team_id=request.POST["team_id"],
+            user_id=request.POST["user_id"],
+            channel_id=request.POST["channel_id"],
             type="command",
             command=request.POST["command"],
             text=request.POST["text"],
             payload=request.POST,
             trigger_id=request.POST["trigger_id"],
+            response_url=request.POST.get("response_url"),
+            team_domain=request.POST["team_domain"],
+            user_name=request.POST["user_name"],
+            channel_name=request.POST["channel_name"],
         )
 
     @classmethod
@@ -149,16 +189,10 @@ class SlackState:
 
         private_metadata = json.loads(payload["view"]["private_metadata"])
 
-        team = Team.objects.get(id=payload["team"]["id"])
-
-        channel = Channel.objects.get(id=private_metadata.get("channel_id"), team=team)
-
-        user = User.objects.get(id=payload["user"]["id"], team=team)
-
         return cls(
-            team,
-            user,
-            channel,
+            team_id=payload["team"]["id"],
+            user_id=payload["user"]["id"],
+            channel_id=private_metadata.get("channel_id"),
             type=payload["type"],
             command=private_metadata.get("action_id"),
             text=private_metadata.get("value"),
@@ -166,6 +200,7 @@ class SlackState:
             ts=private_metadata.get("ts"),
             thread_ts=private_metadata.get("thread_ts"),
             trigger_id=payload["trigger_id"],
+            create_models=False,
         )
 
     @classmethod
@@ -175,33 +210,19 @@ class SlackState:
         if "view" in payload:
             return cls.from_action_view_request(request)
 
-        team, _ = Team.objects.get_or_create(
-            id=payload["team"]["id"], defaults={"domain": payload["team"]["domain"]}
-        )
-
-        channel, _ = Channel.objects.get_or_create(
-            id=payload["channel"]["id"],
-            team=team,
-            defaults={"name": payload["channel"]["name"]},
-        )
-
-        user, _ = User.objects.get_or_create(
-            id=payload["user"]["id"],
-            team=team,
-            defaults={"name": payload["user"]["name"]},
-        )
-
         command = (
             payload["actions"][0]["action_id"]
             if "actions" in payload
             else payload["callback_id"]
         )
-        text = payload["actions"][0]["value"] if "actions" in payload else ""
+        action = payload["actions"][0] if "actions" in payload else {}
+        # Menus (overflow, selects) send the value of the selected option
+        text = action.get("value", action.get("selected_option", {}).get("value", ""))
 
         return cls(
-            team,
-            user,
-            channel,
+            team_id=payload["team"]["id"],
+            user_id=payload["user"]["id"],
+            channel_id=payload["channel"]["id"],
             type=payload["type"],
             command=command,
             text=text,
@@ -212,25 +233,23 @@ class SlackState:
                 "message_ts", payload.get("message", {}).get("ts")
             ),
             thread_ts=payload.get("message", {}).get("thread_ts"),
+            team_domain=payload["team"]["domain"],
+            user_name=payload["user"]["name"],
+            channel_name=payload["channel"]["name"],
         )
 
     @classmethod
     def from_event_request(cls, request: HttpRequest) -> "SlackState":
         payload = json.loads(request.body)
 
-        team = Team.objects.get(id=payload["event"]["team"])
-
-        channel = Channel.objects.get(id=payload["event"]["channel"], team=team)
-
-        user = User.objects.get(id=payload["event"]["user"], team=team)
-
         return cls(
-            team,
-            user,
-            channel,
+            team_id=payload["event"]["team"],
+            user_id=payload["event"]["user"],
+            channel_id=payload["event"]["channel"],
             type=payload["type"],
             command=payload["event"]["type"],
             text=payload["event"]["text"],
             payload=payload,
             thread_ts=payload["event"].get("thread_ts", None),
+            create_models=False,
         )
@@ -1,11 +1,20 @@
 import logging
 import json
 
+import requests
 import slack.errors
 from algoliasearch.search_client import SearchClient
 from django.http import HttpResponse, JsonResponse
 from django.conf import settings
 
+from workspaces.dedup import (
+    action_delivery_key,
+    command_delivery_key,
+    event_delivery_key,
+    is_duplicate_delivery,
+    release_delivery,
+)
+from workspaces.dispatch import dispatch
 from workspaces.utils import SLACK_ACTIONS, SLACK_EVENTS, SLACK_COMMANDS
 from .utils import SlackState
 from slackblocks.elements import Option
@@ -17,15 +26,38 @@ def oauth(request):
     return "ok"
 
 
+def command_error_response(state):
+    return {
+        "response_type": "ephemeral",
+        "text": f":x: Slack API error. Is <@{settings.TURBOT_USER_ID}> in this channel ? :x:\n`{state.command} {state.text}",
+        "icon_url": settings.ERROR_ICON_URL,
+    }
+
+
+def report_command_error(state, error):
+    if isinstance(error, slack.errors.SlackApiError) and state.response_url:
+        requests.post(state.response_url, json=command_error_response(state))
+
+
 def action(request):
+    key = action_delivery_key(request)
+    if is_duplicate_delivery(request, key):
+        return HttpResponse(status=200)
+
     state = SlackState.from_action_request(request)
     logger.debug(state)
+    if dispatch(SLACK_ACTIONS[state.command], state):
+        return HttpResponse(status=200)
     try:
         for action_fun in SLACK_ACTIONS[state.command]:
             action_fun(state)
     except slack.errors.SlackApiError as e:
         logger.error(e)
+        release_delivery(key)
         return HttpResponse(status=500)
+    except Exception:
+        release_delivery(key)
+        raise
     return HttpResponse(status=200)
 
 
@@ -34,33 +66,46 @@ def event(request):
     # if payload["type"] == "url_verification":
     #    return JsonResponse({"challenge": payload["challenge"]})
 
+    key = event_delivery_key(request)
+    if is_duplicate_delivery(request, key):
+        return HttpResponse(status=200)
+
     state = SlackState.from_event_request(request)
     logger.debug(state)
     event_name = state.command
+    if dispatch(SLACK_EVENTS[event_name], state):
+        return HttpResponse(status=200)
     try:
         for event_fun in SLACK_EVENTS[event_name]:
             event_fun(state)
     except slack.errors.SlackApiError as e:
         logger.error(e)
+        release_delivery(key)
         return HttpResponse(status=500)
+    except Exception:
+        release_delivery(key)
+        raise
     return HttpResponse(status=200)
 
 
 def command(request):
+    key = command_delivery_key(request)
+    if is_duplicate_delivery(request, key):
+        return HttpResponse(status=200)
+
     state = SlackState.from_command_request(request)
     logger.debug(state)
+    if dispatch(SLACK_COMMANDS[state.command], state, report_command_error):
+        return HttpResponse(status=200)
     try:
         for command_fun in SLACK_COMMANDS[state.command]:
             command_fun(state)
     except slack.errors.SlackApiError as e:
         logger.error(e)
-        return JsonResponse(
-            {
-                "response_type": "ephemeral",
-                "text": f":x: Slack API error. Is <@{settings.TURBOT_USER_ID}> in this channel ? :x:\n`{state.command} {state.text}",
-                "icon_url": settings.ERROR_ICON_URL,
-            },
-        )
+        return JsonResponse(command_error_response(state))
+    except Exception:
+        release_delivery(key)
+        raise
     return HttpResponse(status=200)
 
 